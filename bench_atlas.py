@@ -0,0 +1,39 @@
+"""Atlas render benchmark: one clustered map of every country. Run with: python bench_atlas.py"""
+import time
+from country_data import _build_country_info
+from map_generator import _CARD_TEMPLATE_SOURCE, render_atlas
+from stub_services import build_country_records
+
+
+def render_marker_per_country(country_infos):
+    """The single-country approach repeated per country (a marker plus an embedded flip card each), as the baseline."""
+    import folium
+    from jinja2 import Template
+    template = Template(_CARD_TEMPLATE_SOURCE)
+    world = folium.Map(location=[20, 0], zoom_start=2)
+    for info in country_infos:
+        card_html = template.render(flag_img_html="", name=info["Name"], capital=info["Capital"], region=info["Region"],
+                                    population=f"{info['Population']:,}", area=info["Area"], currency=info["Currency"],
+                                    timezone=info["Timezone"], fun_fact="", wiki_url="")
+        folium.Marker(location=info["Coordinates"], popup=folium.Popup(folium.IFrame(card_html, width=280, height=390)),
+                      tooltip=info["Name"]).add_to(world)
+    return world.get_root().render()
+
+
+def bench_atlas(repeat=5):
+    """Time and size the clustered atlas against one embedded card per marker, for every ISO 3166 country."""
+    infos = [info for info in (_build_country_info(r, r["name"]["common"]) for r in build_country_records())
+             if info["Coordinates"]]
+    print(f"{len(infos)} countries")
+    for label, render in (("per-marker cards", render_marker_per_country), ("clustered atlas", render_atlas)):
+        render(infos)  # warm imports and templates
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            html = render(infos)
+            timings.append(time.perf_counter() - start)
+        print(f"{label:<17}: {min(timings) * 1000:8.1f} ms  {len(html.encode('utf-8')) / 1024:8.1f} KiB")
+
+
+if __name__ == "__main__":
+    bench_atlas()
@@ -0,0 +1,42 @@
+"""Micro-benchmarks for country_data lookups. Run with: python bench_country_data.py"""
+import timeit
+import pycountry
+from country_data import normalize_country_name
+
+SAMPLE_INPUTS = ["IN", "usa", "Japan", "france", "Viet Nam", "Taiwan", "UK", "XYZLAND", "  de  ", "Bolivia"]
+
+
+def linear_scan_normalize(input_name):
+    """The original pycountry scan, kept here as the baseline for comparison."""
+    input_cleaned = input_name.strip().lower()
+    if input_cleaned == "uk":
+        input_cleaned = "gb"
+    for country in pycountry.countries:
+        if input_cleaned == country.alpha_2.lower() or input_cleaned == country.alpha_3.lower():
+            return country.name
+        if input_cleaned == country.name.lower():
+            return country.name
+        if hasattr(country, "common_name") and input_cleaned == country.common_name.lower():
+            return country.name
+    return input_name
+
+
+def bench_normalize(number=2000):
+    """Time the indexed normalize_country_name against the linear scan over SAMPLE_INPUTS."""
+    for name in SAMPLE_INPUTS:
+        assert normalize_country_name(name) == linear_scan_normalize(name), name
+
+    def run(fn):
+        for name in SAMPLE_INPUTS:
+            fn(name)
+
+    scan = min(timeit.repeat(lambda: run(linear_scan_normalize), number=number // 10, repeat=3)) * 10
+    index = min(timeit.repeat(lambda: run(normalize_country_name), number=number, repeat=3))
+    per_call = number * len(SAMPLE_INPUTS)
+    print(f"linear scan : {scan / per_call * 1e6:8.2f} us/call")
+    print(f"lookup index: {index / per_call * 1e6:8.2f} us/call")
+    print(f"speedup     : {scan / index:8.1f}x")
+
+
+if __name__ == "__main__":
+    bench_normalize()
@@ -0,0 +1,141 @@
+"""End-to-end Explore latency benchmark against local stub services.
+
+Run with e.g.: python bench_explore.py --countries 40 --latency restcountries=0.08 wikipedia=0.15 --fail exchangerate=0.1
+"""
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import wait
+
+# Keep benchmark caches away from the user's real ones; must happen before the app modules load.
+os.environ.setdefault("GLOBEIO_CACHE_DIR", tempfile.mkdtemp(prefix="globeio-bench-"))
+
+import circuit_breaker
+import country_data
+import flag_cache
+import map_generator
+from country_data import Country, geocode_country, get_currency_conversion
+from map_generator import MapView
+from pipeline import ExplorePipeline
+from stub_services import StubServices
+
+STAGES = ["fetch_country", "currency", "geocode", "map_render", "end_to_end"]
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of a list of numbers."""
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+
+def reset_caches():
+    """Empty every cache and close every circuit breaker so the next measurement is cold."""
+    for cache in (country_data._country_info_cache, country_data._rest_cache, country_data._summary_cache,
+                  country_data._rates_cache, country_data._geocode_cache):
+        cache.clear()
+    map_generator.clear_map_cache()
+    flag_cache._thumbnails.clear()
+    shutil.rmtree(flag_cache.FLAG_DIR, ignore_errors=True)
+    # An injected failure opens a breaker; without this, later samples would time the short-circuit instead.
+    circuit_breaker.reset_all()
+
+
+def timed(samples, errors, stage, fn, *args):
+    """Run fn, recording its latency under stage (or an error if it raises or returns nothing)."""
+    start = time.perf_counter()
+    try:
+        result = fn(*args)
+    except Exception:
+        result = None
+    samples[stage].append(time.perf_counter() - start)
+    if not result:
+        errors[stage] += 1
+    return result
+
+
+def explore_end_to_end(explore, name):
+    """Run one Explore through the pipeline and wait until every fetch it started has finished."""
+    finished = threading.Event()
+    outcome = {}
+    explore.start(
+        name,
+        "Default",
+        on_map=lambda map_view: (outcome.setdefault("map", map_view), finished.set()),
+        on_error=lambda title, message: (outcome.setdefault("error", title), finished.set()),
+    )
+    run = explore._current_run
+    finished.wait(60)
+    wait(list(run.futures))
+    return "map" in outcome
+
+
+def run_benchmark(names, iterations=1, warm=False):
+    """Measure each stage and the whole Explore for every name; returns (samples, errors)."""
+    samples = {stage: [] for stage in STAGES}
+    errors = dict.fromkeys(STAGES, 0)
+    explore = ExplorePipeline(lambda fn: fn())
+    for _ in range(iterations):
+        for name in names:
+            if not warm:
+                reset_caches()
+            country = timed(samples, errors, "fetch_country", Country.fetch_country, name)
+            if country:
+                code = country.currency.split("(")[-1].split(")")[0]
+                timed(samples, errors, "currency", get_currency_conversion, code)
+                location = timed(samples, errors, "geocode", geocode_country, country.name)
+                if location:
+                    map_view = MapView(country.name, location[0], location[1], map_type="Default")
+                    timed(samples, errors, "map_render", lambda: map_view.generate_map(country) or True)
+            if not warm:
+                reset_caches()
+            timed(samples, errors, "end_to_end", explore_end_to_end, explore, name)
+    explore.shutdown()
+    return samples, errors
+
+
+def print_report(samples, errors):
+    """Print p50/p95/p99 latency in milliseconds for every stage."""
+    print(f"{'stage':<14} {'n':>5} {'errors':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for stage in STAGES:
+        values = samples[stage]
+        if not values:
+            print(f"{stage:<14} {0:>5} {errors[stage]:>7}")
+            continue
+        p50, p95, p99 = (percentile(values, p) * 1000 for p in (50, 95, 99))
+        print(f"{stage:<14} {len(values):>5} {errors[stage]:>7} {p50:>9.1f} {p95:>9.1f} {p99:>9.1f}")
+
+
+def _parse_rates(pairs):
+    """Turn ["wikipedia=0.2", ...] into {"wikipedia": 0.2, ...}."""
+    return {service: float(value) for service, value in (pair.split("=", 1) for pair in pairs)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--countries", type=int, default=25, help="number of countries to sample")
+    parser.add_argument("--iterations", type=int, default=1)
+    parser.add_argument("--latency", nargs="*", default=[], metavar="SERVICE=SECONDS",
+                        help="per-service latency, e.g. restcountries=0.08")
+    parser.add_argument("--fail", nargs="*", default=[], metavar="SERVICE=RATE",
+                        help="per-service failure rate between 0 and 1")
+    parser.add_argument("--warm", action="store_true", help="keep caches between runs")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    with StubServices(_parse_rates(args.latency), _parse_rates(args.fail), seed=args.seed) as stubs:
+        stubs.configure_app()
+        country_data.ACCESS_KEY = "benchmark"
+        names = [record["name"]["common"] for record in random.Random(args.seed).sample(
+            stubs._records, min(args.countries, len(stubs._records)))]
+        samples, errors = run_benchmark(names, args.iterations, args.warm)
+    print_report(samples, errors)
+    print(f"\nstub requests: {stubs.requests}")
+
+
+if __name__ == "__main__":
+    main()
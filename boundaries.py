@@ -0,0 +1,214 @@
+"""Country outlines from a local GeoJSON boundary dataset, pre-simplified for each zoom level.
+
+Point GLOBEIO_BOUNDARIES_PATH at a country polygons GeoJSON file (e.g. Natural Earth admin 0 countries)
+or copy one to ~/.globeio/boundaries.geojson. The first load simplifies every outline at each of
+TOLERANCES and caches the result next to it as quantized integer arrays in a .npz file.
+"""
+import argparse
+import json
+import os
+import numpy as np
+from cache import CACHE_DIR
+from telemetry import span
+
+BOUNDARIES_PATH = os.getenv("GLOBEIO_BOUNDARIES_PATH", os.path.join(CACHE_DIR, "boundaries.geojson"))
+
+# Douglas-Peucker tolerances in degrees, coarsest first.
+TOLERANCES = (0.5, 0.1, 0.02, 0.005)
+# Coordinates are stored as integers in units of 1e-5 degrees (about 1 m).
+SCALE = 100000
+
+# Property names different datasets use for the ISO alpha-2 code.
+CODE_PROPERTIES = ("ISO_A2", "iso_a2", "ISO_A2_EH", "ISO3166-1-Alpha-2", "iso2", "cca2")
+
+_boundaries = None
+
+
+def _simplify(ring, tolerance):
+    """Douglas-Peucker simplification of a closed ring given as an (n, 2) array."""
+    if len(ring) <= 4:
+        return ring
+    keep = np.zeros(len(ring), dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(ring) - 1)]
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+        start, end = ring[first], ring[last]
+        segment = end - start
+        points = ring[first + 1:last] - start
+        length = np.hypot(*segment)
+        if length == 0:
+            distances = np.hypot(points[:, 0], points[:, 1])
+        else:
+            distances = np.abs(segment[0] * points[:, 1] - segment[1] * points[:, 0]) / length
+        index = int(np.argmax(distances))
+        if distances[index] > tolerance:
+            split = first + 1 + index
+            keep[split] = True
+            stack.append((first, split))
+            stack.append((split, last))
+    return ring[keep]
+
+
+def tolerance_for_zoom(zoom):
+    """The coarsest tolerance that stays under one screen pixel (256px tiles) at a Leaflet zoom level."""
+    degrees_per_pixel = 360.0 / (256 * 2 ** zoom)
+    for tolerance in TOLERANCES:
+        if tolerance <= degrees_per_pixel:
+            return tolerance
+    return TOLERANCES[-1]
+
+
+def _polygons(geometry):
+    """The polygons of a Polygon or MultiPolygon geometry, each a list of rings."""
+    if geometry is None:
+        return []
+    if geometry["type"] == "Polygon":
+        return [geometry["coordinates"]]
+    if geometry["type"] == "MultiPolygon":
+        return geometry["coordinates"]
+    return []
+
+
+def _feature_code(feature):
+    properties = feature.get("properties") or {}
+    for name in CODE_PROPERTIES:
+        code = properties.get(name)
+        if isinstance(code, str) and len(code) == 2 and code.isalpha():
+            return code.upper()
+    return None
+
+
+class BoundaryStore:
+    """Simplified outlines of every country, one packed level per tolerance.
+
+    Each level holds all ring points as one int32 (n, 2) array plus cumulative end offsets per ring and
+    per country, and a flag marking the rings that start a new polygon (the rest are its holes).
+    """
+
+    def __init__(self, codes, levels):
+        self.codes = list(codes)
+        self._row = {code: i for i, code in enumerate(self.codes)}
+        self._levels = levels
+
+    @classmethod
+    def from_geojson(cls, collection):
+        """Simplify every country polygon in a GeoJSON FeatureCollection at each of TOLERANCES."""
+        features = [(code, feature) for code, feature in ((_feature_code(f), f) for f in collection["features"]) if code]
+        codes = [code for code, _ in features]
+        levels = {}
+        for tolerance in TOLERANCES:
+            points, ring_ends, polygon_starts, country_ends = [], [], [], []
+            count = 0
+            for _, feature in features:
+                kept = []
+                polygons = [[np.asarray(ring, dtype=np.float64)[:, :2] for ring in polygon]
+                            for polygon in _polygons(feature.get("geometry"))]
+                for polygon in polygons:
+                    outer = _simplify(polygon[0], tolerance)
+                    if len(outer) < 4:
+                        continue
+                    kept.append([outer] + [hole for hole in (_simplify(h, tolerance) for h in polygon[1:]) if len(hole) >= 4])
+                if not kept and polygons:
+                    # Never let a small country vanish: keep its largest polygon as drawn.
+                    kept = [[max((polygon[0] for polygon in polygons), key=len)]]
+                for polygon in kept:
+                    for ring_index, ring in enumerate(polygon):
+                        points.append(np.round(ring * SCALE).astype(np.int32))
+                        count += len(ring)
+                        ring_ends.append(count)
+                        polygon_starts.append(ring_index == 0)
+                country_ends.append(len(ring_ends))
+            levels[tolerance] = {
+                "points": np.concatenate(points) if points else np.zeros((0, 2), dtype=np.int32),
+                "ring_ends": np.asarray(ring_ends, dtype=np.int64),
+                "polygon_starts": np.asarray(polygon_starts, dtype=bool),
+                "country_ends": np.asarray(country_ends, dtype=np.int64),
+            }
+        return cls(codes, levels)
+
+    @classmethod
+    def load(cls, source=BOUNDARIES_PATH, cache_path=None):
+        """Load the packed outlines for source, simplifying the GeoJSON only when the .npz cache is missing or older."""
+        cache_path = cache_path or os.path.splitext(source)[0] + ".npz"
+        with span("boundary_load"):
+            if os.path.exists(cache_path) and os.path.getmtime(cache_path) >= os.path.getmtime(source):
+                return cls.load_packed(cache_path)
+            with open(source, encoding="utf-8") as f:
+                store = cls.from_geojson(json.load(f))
+            store.save(cache_path)
+            return store
+
+    @classmethod
+    def load_packed(cls, path):
+        with np.load(path) as packed:
+            levels = {tolerance: {name: packed[f"{name}_{i}"] for name in ("points", "ring_ends", "polygon_starts", "country_ends")}
+                      for i, tolerance in enumerate(TOLERANCES)}
+            return cls(packed["codes"].tolist(), levels)
+
+    def save(self, path):
+        arrays = {"codes": np.asarray(self.codes)}
+        for i, tolerance in enumerate(TOLERANCES):
+            for name, array in self._levels[tolerance].items():
+                arrays[f"{name}_{i}"] = array
+        tmp_path = f"{path}.tmp.npz"
+        np.savez_compressed(tmp_path, **arrays)
+        os.replace(tmp_path, path)
+
+    def point_count(self, tolerance):
+        return len(self._levels[tolerance]["points"])
+
+    def geometry(self, code, zoom=None, tolerance=None):
+        """GeoJSON MultiPolygon of a country at the detail for zoom (or an explicit tolerance), or None if unknown."""
+        row = self._row.get(code.upper() if code else None)
+        if row is None:
+            return None
+        level = self._levels[tolerance if tolerance is not None else tolerance_for_zoom(zoom)]
+        first_ring = int(level["country_ends"][row - 1]) if row else 0
+        last_ring = int(level["country_ends"][row])
+        polygons = []
+        for ring in range(first_ring, last_ring):
+            start = int(level["ring_ends"][ring - 1]) if ring else 0
+            coordinates = (level["points"][start:int(level["ring_ends"][ring])] / SCALE).tolist()
+            if level["polygon_starts"][ring]:
+                polygons.append([coordinates])
+            else:
+                polygons[-1].append(coordinates)
+        return {"type": "MultiPolygon", "coordinates": polygons}
+
+    def features(self, codes, zoom):
+        """A GeoJSON FeatureCollection of the given countries' outlines for one zoom level."""
+        features = []
+        for code in codes:
+            geometry = self.geometry(code, zoom)
+            if geometry is not None:
+                features.append({"type": "Feature", "properties": {"code": code.upper()}, "geometry": geometry})
+        return {"type": "FeatureCollection", "features": features}
+
+
+def get_boundaries():
+    """The shared BoundaryStore for BOUNDARIES_PATH, or None when no boundary dataset is installed."""
+    global _boundaries
+    if _boundaries is None and os.path.exists(BOUNDARIES_PATH):
+        _boundaries = BoundaryStore.load(BOUNDARIES_PATH)
+    return _boundaries
+
+
+def main(argv=None):
+    """Command line entry point: `python boundaries.py build [geojson]` to precompute the simplified outlines."""
+    parser = argparse.ArgumentParser(description="Country outline cache.")
+    parser.add_argument("command", choices=["build"])
+    parser.add_argument("source", nargs="?", default=BOUNDARIES_PATH)
+    args = parser.parse_args(argv)
+    with open(args.source, encoding="utf-8") as f:
+        store = BoundaryStore.from_geojson(json.load(f))
+    store.save(os.path.splitext(args.source)[0] + ".npz")
+    for tolerance in TOLERANCES:
+        print(f"tolerance {tolerance:<6} {store.point_count(tolerance):>9} points")
+    print(f"{len(store.codes)} countries")
+
+
+if __name__ == "__main__":
+    main()
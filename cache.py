@@ -0,0 +1,123 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from telemetry import incr
+
+CACHE_DIR = os.getenv("GLOBEIO_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".globeio"))
+DEFAULT_DB_PATH = os.path.join(CACHE_DIR, "cache.sqlite3")
+
+
+def open_db(db_path, schema):
+    """Connect to a SQLite file shared across threads, creating its folder and running schema (CREATE ... IF NOT EXISTS)."""
+    if db_path != ":memory:":
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+    conn = sqlite3.connect(db_path, check_same_thread=False)
+    conn.execute(schema)
+    conn.commit()
+    return conn
+
+
+class TTLCache:
+    """Two-level cache (in-memory LRU in front of SQLite) for JSON-serialisable values that expire after ttl seconds.
+
+    When max_disk_entries is set, the entries closest to expiry are evicted from disk once the namespace grows past it.
+    """
+
+    def __init__(self, namespace, ttl, db_path=None, max_memory_entries=256, max_disk_entries=None):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self._db_path = db_path or DEFAULT_DB_PATH
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connect(self):
+        """Open the SQLite file on first use so importing this module stays cheap."""
+        if self._conn is None:
+            self._conn = open_db(
+                self._db_path,
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "namespace TEXT, key TEXT, value TEXT, expires_at REAL, "
+                "PRIMARY KEY (namespace, key))",
+            )
+        return self._conn
+
+    def _remember(self, key, value, expires_at):
+        """Store an entry in the memory tier, evicting the least recently used one when full."""
+        self._memory[key] = (value, expires_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, key, default=None, allow_expired=False):
+        """Return the cached value for key, or default if it is missing or expired (unless allow_expired)."""
+        value = self._get(key, allow_expired)
+        incr(f"cache.{self.namespace}.{'miss' if value is None else 'hit'}")
+        return default if value is None else value
+
+    def _get(self, key, allow_expired):
+        """Look key up in memory, then on disk; None when missing or expired."""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                row = self._connect().execute(
+                    "SELECT value, expires_at FROM entries WHERE namespace = ? AND key = ?",
+                    (self.namespace, key),
+                ).fetchone()
+                if row is None:
+                    return None
+                entry = (json.loads(row[0]), row[1])
+                self._remember(key, *entry)
+            else:
+                self._memory.move_to_end(key)
+            value, expires_at = entry
+            if expires_at < now and not allow_expired:
+                return None
+            return value
+
+    def set(self, key, value, ttl=None):
+        """Store value under key in both tiers for ttl seconds (defaults to the cache's ttl)."""
+        expires_at = time.time() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._remember(key, value, expires_at)
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)",
+                (self.namespace, key, json.dumps(value), expires_at),
+            )
+            if self.max_disk_entries is not None:
+                self._evict_disk(conn)
+            conn.commit()
+
+    def _evict_disk(self, conn):
+        """Drop the entries closest to expiry until the namespace fits in max_disk_entries."""
+        (count,) = conn.execute("SELECT COUNT(*) FROM entries WHERE namespace = ?", (self.namespace,)).fetchone()
+        excess = count - self.max_disk_entries
+        if excess > 0:
+            conn.execute(
+                "DELETE FROM entries WHERE namespace = ? AND key IN "
+                "(SELECT key FROM entries WHERE namespace = ? ORDER BY expires_at LIMIT ?)",
+                (self.namespace, self.namespace, excess),
+            )
+
+    def delete(self, key):
+        """Remove key from both tiers."""
+        with self._lock:
+            self._memory.pop(key, None)
+            conn = self._connect()
+            conn.execute("DELETE FROM entries WHERE namespace = ? AND key = ?", (self.namespace, key))
+            conn.commit()
+
+    def clear(self):
+        """Remove every entry in this cache's namespace."""
+        with self._lock:
+            self._memory.clear()
+            conn = self._connect()
+            conn.execute("DELETE FROM entries WHERE namespace = ?", (self.namespace,))
+            conn.commit()
@@ -0,0 +1,122 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+from telemetry import incr
+
+# Consecutive failures that open a breaker, and seconds before a trial call is let through again.
+FAILURE_THRESHOLD = int(os.getenv("GLOBEIO_BREAKER_FAILURES", 3))
+RESET_TIMEOUT = float(os.getenv("GLOBEIO_BREAKER_RESET", 30))
+
+# A rejected key or exhausted quota will not fix itself within seconds, so ExchangeRate opens at once and stays open longer.
+UPSTREAM_SETTINGS = {
+    "exchangerate": {"failure_threshold": 1, "reset_timeout": 300.0},
+}
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream whose breaker is open."""
+
+    def __init__(self, name, retry_in):
+        super().__init__(f"{name} is unavailable, retrying in {retry_in:.0f}s")
+        self.name = name
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """Stops calling an upstream after failure_threshold consecutive failures; after reset_timeout one trial call
+    is let through (half-open), and its outcome closes or re-opens the breaker."""
+
+    def __init__(self, name, failure_threshold=None, reset_timeout=None, clock=time.monotonic):
+        self.name = name
+        self.failure_threshold = failure_threshold or FAILURE_THRESHOLD
+        self.reset_timeout = RESET_TIMEOUT if reset_timeout is None else reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._clock = clock
+        self._lock = threading.Lock()
+
+    def retry_in(self):
+        """Seconds until an open breaker lets a trial call through (0 when closed)."""
+        if self.state == CLOSED:
+            return 0.0
+        return max(0.0, self._opened_at + self.reset_timeout - self._clock())
+
+    def allow(self):
+        """True if a call may go ahead now; an open breaker past its timeout admits exactly one trial call."""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and self._clock() >= self._opened_at + self.reset_timeout:
+                self.state = HALF_OPEN
+                return True
+        incr(f"breaker.{self.name}.rejected")
+        return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = CLOSED
+            self.failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != OPEN:
+                    incr(f"breaker.{self.name}.open")
+                self.state = OPEN
+                self._opened_at = self._clock()
+
+    @contextmanager
+    def guard(self):
+        """Wrap one upstream call: raises CircuitOpenError when open, and records an exception or call.fail() as a failure."""
+        if not self.allow():
+            raise CircuitOpenError(self.name, self.retry_in())
+        call = _Call()
+        try:
+            yield call
+        except BaseException:
+            self.record_failure()
+            raise
+        if call.failed:
+            self.record_failure()
+        else:
+            self.record_success()
+
+
+class _Call:
+    """Handle for the body of CircuitBreaker.guard() to report a failure that did not raise."""
+
+    def __init__(self):
+        self.failed = False
+
+    def fail(self):
+        self.failed = True
+
+    def check(self, response):
+        """Count 429 and 5xx responses as failures; returns response."""
+        if response.status_code == 429 or response.status_code >= 500:
+            self.failed = True
+        return response
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(name):
+    """The process-wide breaker for an upstream such as "restcountries" or "wikipedia"."""
+    with _breakers_lock:
+        if name not in _breakers:
+            _breakers[name] = CircuitBreaker(name, **UPSTREAM_SETTINGS.get(name, {}))
+        return _breakers[name]
+
+
+def reset_all():
+    """Close every breaker, e.g. between tests or after the network comes back."""
+    with _breakers_lock:
+        for breaker in _breakers.values():
+            breaker.record_success()
@@ -0,0 +1,23 @@
+import os
+import shutil
+import tempfile
+import pytest
+
+# Point every cache at a throwaway folder before the app modules are imported, so test runs never
+# write fake countries or rates into the user's ~/.globeio.
+_CACHE_DIR = tempfile.mkdtemp(prefix="globeio-test-")
+os.environ["GLOBEIO_CACHE_DIR"] = _CACHE_DIR
+
+import circuit_breaker
+
+
+@pytest.fixture(autouse=True)
+def closed_breakers():
+    """Start and leave every test with every circuit breaker closed; they are shared by the whole process."""
+    circuit_breaker.reset_all()
+    yield
+    circuit_breaker.reset_all()
+
+
+def pytest_unconfigure(config):
+    shutil.rmtree(_CACHE_DIR, ignore_errors=True)
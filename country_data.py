@@ -1,45 +1,188 @@
 
+import csv
 import os
-import requests
-import wikipediaapi
-import pycountry
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
+import http_client
+from cache import TTLCache
+from circuit_breaker import CircuitOpenError, get_breaker
+from rate_history import RateHistory
+from telemetry import span
+
+load_dotenv()
+ACCESS_KEY = os.getenv('API_KEY')
+
+# Upstream endpoints; overridable so benchmarks and tests can point at local stand-ins.
+REST_COUNTRIES_URL = os.getenv("GLOBEIO_REST_COUNTRIES_URL", "https://restcountries.com/v3.1")
+EXCHANGE_RATE_URL = os.getenv("GLOBEIO_EXCHANGE_RATE_URL", "http://api.exchangerate.host")
+WIKIPEDIA_API_URL = os.getenv("GLOBEIO_WIKIPEDIA_API_URL", "https://{language}.wikipedia.org/w/api.php")
+NOMINATIM_DOMAIN = os.getenv("GLOBEIO_NOMINATIM_DOMAIN", "nominatim.openstreetmap.org")
+NOMINATIM_SCHEME = os.getenv("GLOBEIO_NOMINATIM_SCHEME", "https")
+
+# How long REST Countries answers stay fresh; country data changes rarely.
+COUNTRY_CACHE_TTL = int(os.getenv("GLOBEIO_COUNTRY_CACHE_TTL", 7 * 24 * 3600))
+# "Not found" answers are cached briefly, so retyping an unknown name does not call the API again.
+NEGATIVE_CACHE_TTL = int(os.getenv("GLOBEIO_NEGATIVE_CACHE_TTL", 300))
+
+# In offline mode lookups are answered only from the cache (expired entries included).
+OFFLINE = os.getenv("GLOBEIO_OFFLINE", "") == "1"
+
+_rest_cache = TTLCache("restcountries", COUNTRY_CACHE_TTL)
+_country_info_cache = TTLCache("country_info", COUNTRY_CACHE_TTL)
+
+# Wikipedia summaries, keyed by (language, title); entries nearest expiry are evicted past the limits.
+WIKI_LANGUAGE = "en"
+SUMMARY_CACHE_TTL = int(os.getenv("GLOBEIO_SUMMARY_CACHE_TTL", 30 * 24 * 3600))
+_summary_cache = TTLCache("wiki_summary", SUMMARY_CACHE_TTL, max_memory_entries=256, max_disk_entries=2000)
+
+# Exchange rates are fetched as one USD-quoted table and refreshed after this many seconds.
+RATES_CACHE_TTL = int(os.getenv("GLOBEIO_RATES_CACHE_TTL", 3600))
+_rates_cache = TTLCache("exchange_rates", RATES_CACHE_TTL)
+# Every table fetched is also kept, for conversion matrices and "as of" lookups without API calls.
+_rate_history = RateHistory()
+
+def parse_currency_codes(text):
+    """Currency codes from a comma-separated list such as "gbp, JPY,,EUR", upper-cased and without blanks."""
+    return [code.strip().upper() for code in text.split(",") if code.strip()]
+
+# Currencies shown in the conversion table, e.g. GLOBEIO_CURRENCY_TARGETS="GBP,JPY,EUR,INR".
+CURRENCY_TARGETS = parse_currency_codes(os.getenv("GLOBEIO_CURRENCY_TARGETS", "GBP,JPY,EUR"))
+
+# Optional bulk-loaded CountryStore; when set, lookups are answered from its indexes.
+_country_store = None
+
+
+def set_offline_mode(enabled):
+    """Switch between live lookups and serving everything from the local cache."""
+    global OFFLINE
+    OFFLINE = bool(enabled)
+
+
+def use_country_store(store):
+    """Serve lookups from a bulk-loaded CountryStore (or stop doing so with None)."""
+    global _country_store
+    _country_store = store
+
+# Abbreviations people type that are not ISO codes, mapped to the code they mean.
+_NAME_ALIASES = {"uk": "gb"}
+
+_name_index = None
+
+
+def _build_name_index():
+    """Build a lowercased alpha-2/alpha-3/name/common/official name -> canonical name map."""
+    import pycountry
+    index = {}
+    # Keys are added in the order the old linear scan checked them, so the first
+    # country to claim a key wins exactly as it did before.
+    for country in pycountry.countries:
+        for key in (country.alpha_2, country.alpha_3, country.name, getattr(country, "common_name", None)):
+            if key:
+                index.setdefault(key.lower(), country.name)
+    for country in pycountry.countries:
+        official = getattr(country, "official_name", None)
+        if official:
+            index.setdefault(official.lower(), country.name)
+    for alias, code in _NAME_ALIASES.items():
+        if code in index:
+            index.setdefault(alias, index[code])
+    return index
+
+
+def warm_name_index():
+    """Build the country name index now (pycountry's ISO tables included) instead of on the first search."""
+    global _name_index
+    if _name_index is None:
+        _name_index = _build_name_index()
+    return _name_index
+
 
 def normalize_country_name(input_name):
     """Convert ISO codes or common abbreviations to official country names using pycountry."""
-    input_cleaned = input_name.strip().lower()
-    for country in pycountry.countries:
-        if input_cleaned == country.alpha_2.lower() or input_cleaned == country.alpha_3.lower():
-            return country.name
-        if input_cleaned == country.name.lower():
-            return country.name
-        if hasattr(country, "common_name") and input_cleaned == country.common_name.lower():
-            return country.name
-    return input_name
-
-def get_country_data(country_input):
+    return warm_name_index().get(input_name.strip().lower(), input_name)
+
+def get_country_data(country_input, with_fun_fact=True):
     """Fetch accurate country data from REST Countries API."""
-    normalized_name = normalize_country_name(country_input)
+    with span("normalize"):
+        normalized_name = normalize_country_name(country_input)
+    country_info = _lookup_country_info(country_input, normalized_name)
+    if country_info is None:
+        return None
+
+    # The Wikipedia fun fact is filled in separately so callers can fetch it concurrently. Summaries have
+    # their own cache, so it goes on a copy: a fallback answer must not be stored with the country.
+    if with_fun_fact and country_info.get("Fun Fact") is None:
+        country_info = dict(country_info, **{"Fun Fact": get_fun_fact(country_info["Name"])})
+    return country_info
+
+def _lookup_country_info(country_input, normalized_name):
+    """Find country_info in the bulk store, then the cache, then REST Countries."""
+    if _country_store is not None:
+        for name in (normalized_name, country_input):
+            country_info = _country_store.country_info(name, lambda record: _build_country_info(record, normalized_name))
+            if country_info is not None:
+                return country_info
 
-    url = f"https://restcountries.com/v3.1/name/{normalized_name}"
-    response = requests.get(url)
-    if response.status_code != 200:
+    cache_key = normalized_name.lower()
+
+    country_info = _country_info_cache.get(cache_key, allow_expired=OFFLINE)
+    if country_info is not None:
+        return country_info
+
+    results = _rest_cache.get(cache_key, allow_expired=OFFLINE)
+    if results is None:
+        if OFFLINE:
+            return None
+        # Codes go to /alpha: pycountry names such as "Bolivia, Plurinational State of" miss on /name.
+        code = _iso_code(country_input, normalized_name)
+        url = f"{REST_COUNTRIES_URL}/alpha/{code}" if code else f"{REST_COUNTRIES_URL}/name/{normalized_name}"
+        try:
+            with get_breaker("restcountries").guard() as call, span("rest_fetch", country=normalized_name) as fields:
+                response = call.check(http_client.get(url))
+                fields["status"] = response.status_code
+                if response.status_code == 404:
+                    _rest_cache.set(cache_key, [], ttl=NEGATIVE_CACHE_TTL)
+                    return None
+                if response.status_code != 200:
+                    return None
+                results = response.json()
+        except CircuitOpenError:
+            # REST Countries is failing: answer from expired entries as offline mode does, else not found.
+            country_info = _country_info_cache.get(cache_key, allow_expired=True)
+            if country_info is not None:
+                return country_info
+            results = _rest_cache.get(cache_key, allow_expired=True)
+            if results is None:
+                return None
+        else:
+            _rest_cache.set(cache_key, results)
+    if not results:
         return None
 
-    results = response.json()
+    country_info = _build_country_info(_match_country(results, normalized_name), normalized_name)
+    _country_info_cache.set(cache_key, country_info)
+    return country_info
+
+def _iso_code(country_input, normalized_name):
+    """country_input stripped if it is an ISO alpha-2/alpha-3 code (one the name index knows), else None."""
+    code = country_input.strip()
+    if len(code) in (2, 3) and code.isalpha() and code.lower() not in _NAME_ALIASES and normalized_name != country_input:
+        return code
+    return None
 
-    match = None
+def _match_country(results, normalized_name):
+    """Pick the REST Countries result whose name or alternate spelling matches the query."""
     for country in results:
         common = country.get("name", {}).get("common", "").lower()
         official = country.get("name", {}).get("official", "").lower()
         alt_spellings = [s.lower() for s in country.get("altSpellings", [])]
 
         if normalized_name.lower() in (common, official) or normalized_name.lower() in alt_spellings:
-            match = country
-            break
-
-    data = match or results[0]
+            return country
+    return results[0]
 
+def _build_country_info(data, normalized_name):
+    """Derive the country_info dict used by the GUI and map from one REST Countries record."""
     currencies = data.get("currencies", {})
     first_currency = list(currencies.keys())[0] if currencies else "N/A"
     currency_name = currencies.get(first_currency, {}).get("name", "N/A")
@@ -49,7 +192,7 @@ def get_country_data(country_input):
 
     display_name = data.get("name", {}).get("common", normalized_name)
 
-    country_info = {
+    return {
         "Name": display_name,
         "Capital": data.get("capital", ["N/A"])[0],
         "Region": data.get("region", "N/A"),
@@ -57,63 +200,197 @@ def get_country_data(country_input):
         "Area": data.get("area", "N/A"),
         "Currency": f"{currency_name} ({first_currency}) {currency_symbol}",
         "Timezone": timezone,
-        "Flag": match.get("flags", {}).get("png", ""),
-        "Fun Fact": get_fun_fact(display_name)
+        "Flag": data.get("flags", {}).get("png", ""),
+        "Fun Fact": None,
+        "Code": data.get("cca2", ""),
+        "Coordinates": data.get("latlng"),
+        "Borders": data.get("borders", [])
     }
 
-    return country_info
+def build_country_info(record):
+    """The country_info dict for one raw REST Countries record, e.g. from the bulk store."""
+    return _build_country_info(record, record.get("name", {}).get("common", ""))
+
+def _fetch_wiki_intro(title, language):
+    """Ask the MediaWiki extracts API for the plain-text intro of a page ("" if there is no such page)."""
+    params = {
+        "action": "query",
+        "format": "json",
+        "prop": "extracts",
+        "exintro": 1,
+        "explaintext": 1,
+        "redirects": 1,
+        "titles": title,
+    }
+    with get_breaker("wikipedia").guard() as call:
+        response = call.check(http_client.get(WIKIPEDIA_API_URL.format(language=language), params=params))
+        pages = response.json().get("query", {}).get("pages", {})
+    return next((page.get("extract", "") for page in pages.values() if "missing" not in page), "")
 
-def get_fun_fact(country_name):
+
+def get_fun_fact(country_name, language=WIKI_LANGUAGE):
     """Fetch a fun fact from Wikipedia with a proper User-Agent."""
-    wiki = wikipediaapi.Wikipedia(
-        language="en",
-        extract_format=wikipediaapi.ExtractFormat.WIKI,
-        user_agent="GlobeExplorer/1.0 (contact@yourdomain.com)"
-    )
-    page = wiki.page(country_name)
-    return page.summary[:300] + "..." if page.exists() else "No fun facts available."
-
-
-def get_currency_conversion(base_currency):
-    """Convert from base_currency to USD, then use USD → [GBP, JPY, EUR] in one call."""
-    # Load the .env file
-    load_dotenv()
-    # Use the variable
-    ACCESS_KEY = os.getenv('API_KEY')
-    conversions = {}
+    cache_key = f"{language}:{country_name}"
+    fun_fact = _summary_cache.get(cache_key, allow_expired=OFFLINE)
+    if fun_fact is not None:
+        return fun_fact
+    if OFFLINE:
+        return "No fun facts available."
+
+    # Only the intro is needed, so ask for it instead of the whole article.
+    try:
+        with span("wikipedia", title=country_name):
+            summary = _fetch_wiki_intro(country_name, language)
+    except CircuitOpenError:
+        return "No fun facts available."
+    fun_fact = summary[:300] + "..." if summary else "No fun facts available."
+    _summary_cache.set(cache_key, fun_fact)
+    return fun_fact
+
+
+def prefetch_fun_facts(country_names, language=WIKI_LANGUAGE, max_workers=8):
+    """Warm the summary cache for many countries concurrently and return {name: fun fact}."""
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        fun_facts = executor.map(lambda name: get_fun_fact(name, language), country_names)
+        return dict(zip(country_names, fun_facts))
+
+
+def get_usd_rate_table():
+    """Return the cached USD-quoted rate table ({"GBP": 0.79, ...}), fetching it in one call when stale."""
+    rates = _rates_cache.get("USD")
+    if rates is not None:
+        return rates
+    # The last table fetched, even if expired, is served offline, while the breaker is open and when a refresh fails.
+    stale = _rates_cache.get("USD", allow_expired=True)
+    exchange = get_breaker("exchangerate")
+    if OFFLINE or not exchange.allow():
+        return stale  # failing (bad key, quota): stay quiet until the breaker lets a trial call through
+
+    url = f"{EXCHANGE_RATE_URL}/live?access_key={ACCESS_KEY}&source=USD"
+    try:
+        data = http_client.get(url).json()
+    except Exception as e:
+        exchange.record_failure()
+        print("Failed to fetch exchange rates:", e)
+        return stale
+
+    if not data.get("success"):
+        exchange.record_failure()
+        print("Failed to fetch exchange rates:", data.get("error", "Unknown error"))
+        return stale
+
+    if "quotes" not in data:
+        exchange.record_failure()
+        print("Unexpected response format - no 'quotes' field:", data)
+        return stale
+    exchange.record_success()
+
+    # Quotes are keyed "USDGBP"; strip the source prefix so the table is keyed by currency.
+    rates = {pair[3:]: rate for pair, rate in data["quotes"].items()}
+    rates["USD"] = 1.0
+    _rates_cache.set("USD", rates)
+    try:
+        _rate_history.record(rates, data.get("timestamp"))
+    except Exception as e:
+        print("Could not store exchange rate history:", e)
+    return rates
+
+
+CENTROIDS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "country_centroids.csv")
+_centroids = None
+
+# Nominatim is only a last resort, so its answers are kept for a long time.
+GEOCODE_CACHE_TTL = int(os.getenv("GLOBEIO_GEOCODE_CACHE_TTL", 30 * 24 * 3600))
+_geocode_cache = TTLCache("geocode", GEOCODE_CACHE_TTL)
 
+
+def lookup_centroid(country):
+    """Return the (latitude, longitude) of a country from the local centroid table, by ISO alpha-2 code or name."""
+    global _centroids
+    if _centroids is None:
+        with open(CENTROIDS_PATH, newline="", encoding="utf-8") as f:
+            _centroids = {row["country"]: (float(row["latitude"]), float(row["longitude"])) for row in csv.DictReader(f)}
+    if country.upper() in _centroids:
+        return _centroids[country.upper()]
+    import pycountry
+    try:
+        return _centroids.get(pycountry.countries.lookup(country).alpha_2)
+    except LookupError:
+        return None
+
+
+def geocode_country(country_name):
+    """Look up a country's (latitude, longitude) with Nominatim, or None if it cannot be located."""
+    cache_key = country_name.lower()
+    cached = _geocode_cache.get(cache_key, allow_expired=OFFLINE)
+    if cached is not None:
+        return tuple(cached) if cached else None
+    if OFFLINE:
+        return None
     try:
-        #  base_currency to USD
-        url_to_usd = f"http://api.exchangerate.host/convert?access_key={ACCESS_KEY}&from={base_currency}&to=USD&amount=1"
-        response_usd = requests.get(url_to_usd)
-        data_usd = response_usd.json()
+        with get_breaker("nominatim").guard() as call, span("nominatim", country=country_name):
+            url = f"{NOMINATIM_SCHEME}://{NOMINATIM_DOMAIN}/search"
+            response = call.check(http_client.get(url, params={"q": country_name, "format": "json", "limit": 1}))
+            places = response.json() if response.status_code == 200 else None
+    except CircuitOpenError:
+        return None
+    if places == []:
+        _geocode_cache.set(cache_key, [], ttl=NEGATIVE_CACHE_TTL)
+    if not places:
+        return None
+    location = [float(places[0]["lat"]), float(places[0]["lon"])]
+    _geocode_cache.set(cache_key, location)
+    return tuple(location)
+
+
+def get_coordinates(country):
+    """Return (latitude, longitude) for a Country: REST Countries latlng, then the centroid table, then Nominatim."""
+    with span("geocode", country=country.name) as fields:
+        if country.latitude is not None and country.longitude is not None:
+            fields["source"] = "restcountries"
+            return country.latitude, country.longitude
+        centroid = lookup_centroid(country.code) if country.code else None
+        if centroid is None:
+            centroid = lookup_centroid(country.name)
+        if centroid is not None:
+            fields["source"] = "centroids"
+            return centroid
+        fields["source"] = "nominatim"
+        return geocode_country(country.name)
 
-        if not data_usd.get("success"):
-            print("Failed to convert base currency to USD:", data_usd.get("error", "Unknown error"))
+
+def get_currency_conversion(base_currency, targets=None, as_of=None):
+    """Convert 1 base_currency to USD and each target currency using cross rates from the cached USD table.
+
+    With as_of (epoch seconds, datetime or ISO date) the rates come from the stored history instead of the API.
+    """
+    targets = CURRENCY_TARGETS if targets is None else targets
+    conversions = {}
+
+    try:
+        with span("currency", base=base_currency):
+            if as_of is None:
+                rates = get_usd_rate_table()
+            else:
+                snapshot = _rate_history.snapshot(as_of)
+                rates = snapshot[1] if snapshot else None
+        if rates is None:
             return None
 
-        if "result" not in data_usd:
-            print("Unexpected response format - no 'result' field:", data_usd)
+        if base_currency not in rates:
+            print(f"No exchange rate available for {base_currency}")
             return None
 
-        usd_amount = data_usd["result"]
+        usd_amount = 1 / rates[base_currency]
         conversions["USD"] = round(usd_amount, 4)
 
-        #  USD to GBP, JPY, EUR
-        symbols = ["GBP", "JPY", "EUR"]
-        for symbol in symbols:
-            url = f"http://api.exchangerate.host/convert?access_key={ACCESS_KEY}&from=USD&to={symbol}&amount={usd_amount}"
-            response = requests.get(url)
-            data = response.json()
-
-            if not data.get("success"):
-                print(f"Failed to convert USD to {symbol}:", data.get("error", "Unknown error"))
+        for symbol in targets:
+            if symbol == "USD":
+                continue
+            if symbol not in rates:
+                print(f"No exchange rate available for {symbol}")
                 continue  # Skip this currency but continue with others
-
-            if "result" in data:
-                conversions[symbol] = round(data["result"], 4)
-            else:
-                print(f"No result for USD→{symbol} conversion:", data)
+            conversions[symbol] = round(usd_amount * rates[symbol], 4)
 
         return conversions
 
@@ -123,8 +400,11 @@ def get_currency_conversion(base_currency):
 
 
 class Country:
+    __slots__ = ("name", "capital", "region", "population", "area", "currency", "timezone", "flag_url", "fun_fact",
+                 "code", "latitude", "longitude", "borders")
 
-    def __init__(self, name, capital, region, population, area, currency, timezone, flag_url, fun_fact):
+    def __init__(self, name, capital, region, population, area, currency, timezone, flag_url, fun_fact,
+                 code="", latitude=None, longitude=None, borders=()):
         """Constructor method for class Country"""
         self.name = name
         self.capital = capital
@@ -135,12 +415,17 @@ class Country:
         self.timezone = timezone
         self.flag_url = flag_url
         self.fun_fact = fun_fact
+        self.code = code
+        self.latitude = latitude
+        self.longitude = longitude
+        self.borders = list(borders)
 
-    def fetch_country(name):
-        """Fetch country info and return a Country object."""
-        info = get_country_data(name)
+    def fetch_country(name, with_fun_fact=True):
+        """Fetch country info and return a Country object (fun_fact is None when with_fun_fact is False)."""
+        info = get_country_data(name, with_fun_fact)
         if not info:
             return None
+        coordinates = info.get("Coordinates") or [None, None]
         return Country(
             name=info["Name"],
             capital=info["Capital"],
@@ -150,5 +435,9 @@ class Country:
             currency=info["Currency"],
             timezone=info["Timezone"],
             flag_url=info["Flag"],
-            fun_fact=info["Fun Fact"]
+            fun_fact=info["Fun Fact"],
+            code=info.get("Code", ""),
+            latitude=coordinates[0],
+            longitude=coordinates[1],
+            borders=info.get("Borders", [])
         )
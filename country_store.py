@@ -0,0 +1,139 @@
+import argparse
+import json
+import os
+import time
+import http_client
+from cache import CACHE_DIR
+
+BULK_URL = os.getenv("GLOBEIO_REST_COUNTRIES_URL", "https://restcountries.com/v3.1") + "/all"
+SNAPSHOT_PATH = os.path.join(CACHE_DIR, "countries.json")
+
+# REST Countries caps /all at 10 fields per request, so the dataset is fetched
+# in groups that share "cca3" as the join key.
+FIELD_GROUPS = (
+    ("cca3", "cca2", "name", "altSpellings", "capital", "region", "population", "area", "flags"),
+    ("cca3", "currencies", "timezones", "latlng", "borders"),
+)
+
+
+def fetch_all_countries():
+    """Download every country from REST Countries in one bulk call per field group."""
+    merged = {}
+    for fields in FIELD_GROUPS:
+        # The full dataset is a few megabytes, so allow a longer read than single lookups.
+        response = http_client.get(BULK_URL, params={"fields": ",".join(fields)}, timeout=(3.05, 60))
+        response.raise_for_status()
+        for record in response.json():
+            merged.setdefault(record["cca3"], {}).update(record)
+    return list(merged.values())
+
+
+class CountryStore:
+    """In-memory REST Countries dataset with name indexes, loaded in bulk or from a snapshot file."""
+
+    def __init__(self, records, fetched_at=None):
+        self.fetched_at = fetched_at if fetched_at is not None else time.time()
+        self._records = {}
+        self._index = {}
+        self._info = {}
+        for record in records:
+            self._records[record["cca3"]] = record
+        # The first country to claim a name keeps it, mirroring the first-match loop in get_country_data.
+        for code, record in self._records.items():
+            name = record.get("name", {})
+            for key in (name.get("common"), name.get("official"), record.get("cca2"), code):
+                if key:
+                    self._index.setdefault(key.lower(), code)
+        for code, record in self._records.items():
+            for key in record.get("altSpellings", []):
+                self._index.setdefault(key.lower(), code)
+
+    def __len__(self):
+        return len(self._records)
+
+    @classmethod
+    def fetch(cls):
+        """Build a store from a fresh bulk download."""
+        return cls(fetch_all_countries())
+
+    @classmethod
+    def load(cls, path=SNAPSHOT_PATH):
+        """Build a store from a snapshot file written by save()."""
+        with open(path, encoding="utf-8") as f:
+            snapshot = json.load(f)
+        return cls(snapshot["countries"], fetched_at=snapshot["fetched_at"])
+
+    def save(self, path=SNAPSHOT_PATH):
+        """Write the dataset and its fetch time to a snapshot file."""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"fetched_at": self.fetched_at, "countries": list(self._records.values())}, f)
+        os.replace(tmp_path, path)
+
+    def age(self):
+        """Seconds since the dataset was downloaded."""
+        return time.time() - self.fetched_at
+
+    def match(self, name):
+        """Return the raw REST Countries record for a name, code or alternate spelling, or None."""
+        code = self._index.get(name.strip().lower())
+        return self._records.get(code) if code else None
+
+    def records(self):
+        """All raw records in the store."""
+        return list(self._records.values())
+
+    def country_info(self, name, build):
+        """Return the memoized country_info dict for name, creating it with build(record) on first use."""
+        record = self.match(name)
+        if record is None:
+            return None
+        code = record["cca3"]
+        if code not in self._info:
+            self._info[code] = build(record)
+        return self._info[code]
+
+
+def load_country_store(path=SNAPSHOT_PATH, refresh=False):
+    """Load the snapshot at path, downloading and saving a new one if it is missing or refresh is set."""
+    if refresh or not os.path.exists(path):
+        store = CountryStore.fetch()
+        store.save(path)
+        return store
+    return CountryStore.load(path)
+
+
+def format_age(seconds):
+    """Human-readable age such as '3d 4h' or '12m'."""
+    minutes, _ = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    days, hours = divmod(hours, 24)
+    if days:
+        return f"{days}d {hours}h"
+    if hours:
+        return f"{hours}h {minutes}m"
+    return f"{minutes}m"
+
+
+def main(argv=None):
+    """Command line entry point: `python country_store.py refresh|status`."""
+    parser = argparse.ArgumentParser(description="Manage the local REST Countries snapshot.")
+    parser.add_argument("command", choices=["refresh", "status"])
+    parser.add_argument("--path", default=SNAPSHOT_PATH, help="snapshot file location")
+    args = parser.parse_args(argv)
+
+    if args.command == "refresh":
+        store = load_country_store(args.path, refresh=True)
+        print(f"Saved {len(store)} countries to {args.path}")
+    elif not os.path.exists(args.path):
+        print(f"No snapshot at {args.path}; run `python country_store.py refresh`.")
+        return 1
+    else:
+        store = CountryStore.load(args.path)
+        print(f"{len(store)} countries in {args.path}, snapshot age {format_age(store.age())}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
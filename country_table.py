@@ -0,0 +1,133 @@
+import numpy as np
+from country_data import _build_country_info
+from country_store import load_country_store
+
+NUMERIC_COLUMNS = ("population", "area", "latitude", "longitude")
+CATEGORY_COLUMNS = ("region", "currency", "timezone")
+AGGREGATES = ("sum", "mean", "count", "min", "max")
+
+
+def _number(value):
+    """A float for numeric REST fields, NaN for "N/A" or missing values."""
+    return float(value) if isinstance(value, (int, float)) else np.nan
+
+
+def _currency_code(currency):
+    """The ISO code inside a formatted currency such as "Euro (EUR) €"."""
+    return currency.split("(")[-1].split(")")[0] if "(" in currency else currency
+
+
+class CountryTable:
+    """Every country as columns: NumPy arrays for numbers and interned category codes for repeated strings."""
+
+    def __init__(self, infos):
+        # infos: country_info dicts as built by country_data._build_country_info.
+        infos = list(infos)
+        self.names = np.array([info["Name"] for info in infos], dtype=object)
+        self.codes = np.array([info.get("Code", "") for info in infos], dtype=object)
+        coordinates = [info.get("Coordinates") or (None, None) for info in infos]
+        values = {
+            "population": [_number(info["Population"]) for info in infos],
+            "area": [_number(info["Area"]) for info in infos],
+            "latitude": [_number(lat) for lat, _ in coordinates],
+            "longitude": [_number(lon) for _, lon in coordinates],
+        }
+        self._numbers = {column: np.array(values[column], dtype=np.float64) for column in NUMERIC_COLUMNS}
+        with np.errstate(divide="ignore", invalid="ignore"):
+            density = self._numbers["population"] / self._numbers["area"]
+        self._numbers["density"] = np.where(np.isfinite(density), density, np.nan)
+
+        labels = {
+            "region": [info["Region"] for info in infos],
+            "currency": [_currency_code(info["Currency"]) for info in infos],
+            "timezone": [info["Timezone"] for info in infos],
+        }
+        # Each distinct string is stored once; rows hold small integer codes into it.
+        self._categories = {}
+        self._category_codes = {}
+        for column in CATEGORY_COLUMNS:
+            categories, inverse = np.unique(np.array(labels[column], dtype=str), return_inverse=True)
+            self._categories[column] = [str(category) for category in categories]
+            self._category_codes[column] = inverse.astype(np.int32)
+
+    @classmethod
+    def from_records(cls, records):
+        """Build a table from raw REST Countries records, parsed exactly as get_country_data parses them."""
+        return cls(_build_country_info(record, record.get("name", {}).get("common", "")) for record in records)
+
+    @classmethod
+    def from_store(cls, store):
+        return cls.from_records(store.records())
+
+    def __len__(self):
+        return len(self.names)
+
+    def column(self, name):
+        """The NumPy array behind a numeric column (including the derived "density"), or a category column's labels."""
+        if name in self._numbers:
+            return self._numbers[name]
+        if name in self._categories:
+            return np.array(self._categories[name], dtype=object)[self._category_codes[name]]
+        raise KeyError(name)
+
+    def categories(self, column):
+        """The distinct values of a category column, sorted."""
+        return list(self._categories[column])
+
+    def mask(self, **conditions):
+        """Boolean row mask for category equality, e.g. mask(region="Asia") or mask(currency=("EUR", "CHF"))."""
+        mask = np.ones(len(self), dtype=bool)
+        for column, wanted in conditions.items():
+            wanted = [wanted] if isinstance(wanted, str) else list(wanted)
+            lookup = {category: i for i, category in enumerate(self._categories[column])}
+            ids = [lookup[value] for value in wanted if value in lookup]
+            mask &= np.isin(self._category_codes[column], ids)
+        return mask
+
+    def top(self, column, n=10, mask=None, ascending=False):
+        """Row indices of the n largest (or smallest) values of a numeric column, skipping rows without a value."""
+        values = self._numbers[column]
+        candidates = np.flatnonzero(~np.isnan(values) if mask is None else mask & ~np.isnan(values))
+        keys = values[candidates] if ascending else -values[candidates]
+        if n < len(candidates):
+            candidates = candidates[np.argpartition(keys, n)[:n]]
+            keys = values[candidates] if ascending else -values[candidates]
+        return candidates[np.argsort(keys, kind="stable")]
+
+    def aggregate(self, column, by="region", how="sum", mask=None):
+        """Group a numeric column by a category column and reduce it with how, e.g. total population per region."""
+        if how not in AGGREGATES:
+            raise ValueError(f"how must be one of {AGGREGATES}")
+        values = self._numbers[column]
+        groups = self._category_codes[by]
+        keep = ~np.isnan(values) if mask is None else mask & ~np.isnan(values)
+        values, groups = values[keep], groups[keep]
+        size = len(self._categories[by])
+        counts = np.bincount(groups, minlength=size)
+        if how == "count":
+            result = counts.astype(np.float64)
+        elif how in ("sum", "mean"):
+            result = np.bincount(groups, weights=values, minlength=size)
+            if how == "mean":
+                with np.errstate(invalid="ignore"):
+                    result = result / counts
+        else:
+            result = np.full(size, np.inf if how == "min" else -np.inf)
+            (np.minimum if how == "min" else np.maximum).at(result, groups, values)
+        return {category: float(result[i]) for i, category in enumerate(self._categories[by]) if counts[i]}
+
+    def rows(self, indices):
+        """Plain dicts for the given row indices, e.g. the result of top()."""
+        return [{
+            "Name": self.names[i],
+            "Code": self.codes[i],
+            **{column.title(): self._categories[column][self._category_codes[column][i]] for column in CATEGORY_COLUMNS},
+            **{column.title(): float(self._numbers[column][i]) for column in ("population", "area", "density")},
+        } for i in indices]
+
+
+def load_country_table(store=None):
+    """A CountryTable over the bulk REST Countries dataset (the snapshot on disk, downloaded if missing)."""
+    import country_data
+    store = store or country_data._country_store or load_country_store()
+    return CountryTable.from_store(store)
@@ -0,0 +1,83 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from io import BytesIO
+import http_client
+from cache import CACHE_DIR
+from circuit_breaker import CircuitOpenError, get_breaker
+from telemetry import incr, span
+
+FLAG_DIR = os.path.join(CACHE_DIR, "flags")
+
+# Sizes the GUI draws flags at: beside the country name, and in the recent searches list.
+HEADER_FLAG_SIZE = (40, 25)
+RECENT_FLAG_SIZE = (28, 18)
+THUMBNAIL_SIZES = (HEADER_FLAG_SIZE, RECENT_FLAG_SIZE)
+
+MAX_THUMBNAILS = 512
+
+_thumbnails = OrderedDict()
+_lock = threading.Lock()
+
+
+def _flag_path(url):
+    """Location of the raw PNG for a flag URL inside FLAG_DIR."""
+    return os.path.join(FLAG_DIR, hashlib.sha1(url.encode("utf-8")).hexdigest() + ".png")
+
+
+def get_flag_bytes(url, fetch=True):
+    """Return the raw PNG bytes of a flag from disk, downloading and storing them first if fetch is set."""
+    path = _flag_path(url)
+    if os.path.exists(path):
+        with open(path, "rb") as f:
+            return f.read()
+    if not fetch:
+        return None
+    try:
+        with get_breaker("flags").guard() as call:
+            response = call.check(http_client.get(url))
+    except CircuitOpenError:
+        return None
+    if response.status_code != 200:
+        return None
+    os.makedirs(FLAG_DIR, exist_ok=True)
+    tmp_path = f"{path}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(response.content)
+    os.replace(tmp_path, path)
+    return response.content
+
+
+def get_flag_thumbnail(url, size, fetch=True):
+    """Return a decoded PIL thumbnail of a flag at size, from memory, then disk, then the network (if fetch)."""
+    key = (url, tuple(size))
+    with _lock:
+        thumbnail = _thumbnails.get(key)
+        if thumbnail is not None:
+            _thumbnails.move_to_end(key)
+    incr(f"cache.flag.{'miss' if thumbnail is None else 'hit'}")
+    if thumbnail is not None:
+        return thumbnail
+    try:
+        data = get_flag_bytes(url, fetch)
+        if data is None:
+            return None
+        from PIL import Image
+        with span("flag_decode"):
+            image = Image.open(BytesIO(data)).convert("RGBA")
+    except Exception:
+        return None
+    # Decode once and keep every size the GUI uses, so later lookups never touch the file.
+    with _lock:
+        for thumbnail_size in set(THUMBNAIL_SIZES) | {key[1]}:
+            _thumbnails[(url, thumbnail_size)] = image.resize(thumbnail_size)
+            _thumbnails.move_to_end((url, thumbnail_size))
+        while len(_thumbnails) > MAX_THUMBNAILS:
+            _thumbnails.popitem(last=False)
+        return _thumbnails[key]
+
+
+def prefetch_flag(url):
+    """Download a flag and decode its thumbnails ahead of time; returns True when they are cached."""
+    return get_flag_thumbnail(url, HEADER_FLAG_SIZE) is not None
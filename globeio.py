@@ -0,0 +1,165 @@
+"""Headless Globe IO commands, e.g. `python -m globeio batch --all --output maps`."""
+import argparse
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+import pycountry
+from country_data import Country, build_country_info, get_coordinates
+from map_generator import MapView, create_atlas
+
+VIEW_TYPES = ["Default", "Roadmap", "Satellite", "Hybrid"]
+
+
+def map_filename(country_name, view_type):
+    """File name for one country/view, e.g. 'united_states_hybrid.html'."""
+    slug = re.sub(r"[^a-z0-9]+", "_", country_name.lower()).strip("_")
+    return f"{slug}_{view_type.lower()}.html"
+
+
+def resolve_country(name):
+    """Fetch a country through Country.fetch_country and locate it; returns (name, country, coordinates, seconds).
+
+    Errors (network, an open circuit breaker) are reported as a failed lookup so one country cannot abort the batch.
+    """
+    start = time.perf_counter()
+    try:
+        country = Country.fetch_country(name)
+        coordinates = get_coordinates(country) if country else None
+    except Exception:
+        country = coordinates = None
+    return name, country, coordinates, time.perf_counter() - start
+
+
+def render_country_map(country, coordinates, view_type, output_dir):
+    """Process-pool worker: render one map with MapView and return (country name, view type, seconds)."""
+    start = time.perf_counter()
+    map_view = MapView(country.name, coordinates[0], coordinates[1], map_type=view_type)
+    map_view.generate_map(country, os.path.join(output_dir, map_filename(country.name, view_type)))
+    return country.name, view_type, time.perf_counter() - start
+
+
+def run_batch(names, view_types, output_dir, workers=None, fetch_workers=8):
+    """Resolve every country, render each requested view across a process pool and return a timing report."""
+    os.makedirs(output_dir, exist_ok=True)
+    started = time.perf_counter()
+    report = {"resolve": {}, "render": {}, "failed": []}
+
+    resolved = []
+    with ThreadPoolExecutor(max_workers=fetch_workers) as executor:
+        for name, country, coordinates, seconds in executor.map(resolve_country, names):
+            report["resolve"][country.name if country else name] = seconds
+            if country is None or coordinates is None:
+                report["failed"].append(name)
+            else:
+                resolved.append((country, coordinates))
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(render_country_map, country, coordinates, view_type, output_dir): country.name
+            for country, coordinates in resolved
+            for view_type in view_types
+        }
+        for future in as_completed(futures):
+            try:
+                country_name, view_type, seconds = future.result()
+            except Exception:
+                if futures[future] not in report["failed"]:
+                    report["failed"].append(futures[future])
+                continue
+            report["render"].setdefault(country_name, {})[view_type] = seconds
+
+    report["elapsed"] = time.perf_counter() - started
+    report["maps"] = sum(len(views) for views in report["render"].values())
+    return report
+
+
+def print_report(report):
+    """Print per-country timings followed by overall throughput."""
+    print(f"{'Country':<40} {'resolve ms':>10} {'render ms':>10}")
+    for name, views in sorted(report["render"].items()):
+        resolve_ms = report["resolve"].get(name, 0) * 1000
+        render_ms = sum(views.values()) * 1000
+        print(f"{name[:40]:<40} {resolve_ms:>10.1f} {render_ms:>10.1f}")
+    for name in report["failed"]:
+        print(f"{name[:40]:<40} {'failed':>10}")
+    elapsed = report["elapsed"]
+    print(f"\n{report['maps']} maps in {elapsed:.2f}s ({report['maps'] / elapsed if elapsed else 0:.1f} maps/s), "
+          f"{len(report['failed'])} countries failed")
+
+
+def read_country_names(args):
+    """Country names from --all, --file and positional arguments, in that order, without duplicates.
+
+    --all adds every ISO 3166 alpha-3 code, which REST Countries and the bulk store look up exactly.
+    """
+    names = []
+    if args.all:
+        names.extend(country.alpha_3 for country in pycountry.countries)
+    if args.file:
+        with open(args.file, encoding="utf-8") as f:
+            names.extend(line.strip() for line in f if line.strip())
+    names.extend(args.countries)
+    return list(dict.fromkeys(names))
+
+
+def atlas_country_infos(store, regions=(), names=()):
+    """country_info dicts for every country in a CountryStore, or only those in regions or matching names."""
+    if names:
+        records = [record for record in (store.match(name) for name in names) if record is not None]
+    else:
+        records = store.records()
+    infos = [build_country_info(record) for record in records]
+    if regions:
+        wanted = {region.lower() for region in regions}
+        infos = [info for info in infos if str(info["Region"]).lower() in wanted]
+    return sorted(infos, key=lambda info: info["Name"])
+
+
+def run_atlas(names, regions, view_type, output_path, outlines=False):
+    """Render the clustered atlas from the bulk country snapshot and print its size and render time."""
+    import country_data
+    from country_store import load_country_store
+    store = country_data._country_store or load_country_store()
+    infos = atlas_country_infos(store, regions, names)
+    started = time.perf_counter()
+    placed = create_atlas(infos, view_type, output_path, outlines)
+    elapsed = time.perf_counter() - started
+    print(f"{placed} countries in {output_path} ({os.path.getsize(output_path) / 1024:.0f} KiB, {elapsed * 1000:.0f} ms)")
+    return placed
+
+
+def main(argv=None):
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(prog="globeio", description="Headless Globe IO tools.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    batch = commands.add_parser("batch", help="pre-generate maps for many countries")
+    batch.add_argument("countries", nargs="*", help="country names or ISO codes")
+    batch.add_argument("--all", action="store_true", help="every ISO 3166 country")
+    batch.add_argument("--file", help="text file with one country per line")
+    batch.add_argument("--views", nargs="+", choices=VIEW_TYPES, default=VIEW_TYPES)
+    batch.add_argument("--output", default="maps", help="output directory (default: maps)")
+    batch.add_argument("--workers", type=int, default=None, help="render processes (default: CPU count)")
+    batch.add_argument("--fetch-workers", type=int, default=8, help="threads for country lookups")
+
+    atlas = commands.add_parser("atlas", help="one clustered map of every country (or a filtered subset)")
+    atlas.add_argument("countries", nargs="*", help="only these countries (names or ISO codes)")
+    atlas.add_argument("--region", nargs="+", default=[], help="only these regions, e.g. Asia Europe")
+    atlas.add_argument("--view", choices=VIEW_TYPES, default="Default")
+    atlas.add_argument("--output", default="atlas.html", help="output file (default: atlas.html)")
+    atlas.add_argument("--outlines", action="store_true", help="draw country borders (needs a boundary dataset)")
+
+    args = parser.parse_args(argv)
+    if args.command == "atlas":
+        run_atlas(args.countries, args.region, args.view, args.output, args.outlines)
+    elif args.command == "batch":
+        names = read_country_names(args)
+        if not names:
+            parser.error("batch needs country names, --file or --all")
+        print_report(run_batch(names, args.views, args.output, args.workers, args.fetch_workers))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,86 @@
+import threading
+from collections import OrderedDict
+from telemetry import incr
+
+# (connect, read) seconds; a slow host fails fast instead of hanging the UI.
+DEFAULT_TIMEOUT = (3.05, 10)
+MAX_RETRIES = 3
+BACKOFF_FACTOR = 0.5
+POOL_SIZE = 16
+# Longest wait honoured from a Retry-After header; a server asking for an hour must not stall a worker.
+MAX_RETRY_AFTER = 5.0
+USER_AGENT = "GlobeExplorer/1.0 (contact@yourdomain.com)"
+
+# Responses carrying an ETag or Last-Modified header, replayed when the server answers 304.
+MAX_VALIDATED_RESPONSES = 256
+
+_session = None
+_session_lock = threading.Lock()
+_validated = OrderedDict()
+_validated_lock = threading.Lock()
+
+
+def get_session():
+    """The process-wide requests.Session with keep-alive pools per host and bounded retries."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            # requests costs ~100ms to import; load it on the first fetch, not at GUI startup.
+            import requests
+            from requests.adapters import HTTPAdapter
+            from urllib3.util.retry import Retry
+
+            class _CountingRetry(Retry):
+                """urllib3 Retry that reports every retry to the telemetry counters and caps Retry-After waits."""
+
+                def increment(self, *args, **kwargs):
+                    incr("http.retries")
+                    return super().increment(*args, **kwargs)
+
+                def get_retry_after(self, response):
+                    retry_after = super().get_retry_after(response)
+                    return None if retry_after is None else min(retry_after, MAX_RETRY_AFTER)
+
+            retry = _CountingRetry(
+                total=MAX_RETRIES,
+                backoff_factor=BACKOFF_FACTOR,
+                status_forcelist=(429, 500, 502, 503, 504),
+                allowed_methods=frozenset(["GET"]),
+                raise_on_status=False,
+                respect_retry_after_header=True,
+            )
+            adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE, max_retries=retry)
+            session = requests.Session()
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            session.headers["User-Agent"] = USER_AGENT
+            _session = session
+        return _session
+
+
+def get(url, params=None, headers=None, timeout=DEFAULT_TIMEOUT):
+    """GET url through the shared session, revalidating earlier responses with If-None-Match/If-Modified-Since."""
+    import requests
+    cache_key = requests.Request("GET", url, params=params).prepare().url
+    with _validated_lock:
+        cached = _validated.get(cache_key)
+    request_headers = dict(headers or {})
+    if cached is not None:
+        if cached.headers.get("ETag"):
+            request_headers["If-None-Match"] = cached.headers["ETag"]
+        if cached.headers.get("Last-Modified"):
+            request_headers["If-Modified-Since"] = cached.headers["Last-Modified"]
+
+    response = get_session().get(url, params=params, headers=request_headers, timeout=timeout)
+
+    if response.status_code == 304 and cached is not None:
+        incr("cache.http.hit")
+        return cached
+    if response.status_code == 200 and (response.headers.get("ETag") or response.headers.get("Last-Modified")):
+        response.content  # read the body now so it can be replayed later
+        with _validated_lock:
+            _validated[cache_key] = response
+            _validated.move_to_end(cache_key)
+            while len(_validated) > MAX_VALIDATED_RESPONSES:
+                _validated.popitem(last=False)
+    return response
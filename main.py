@@ -1,31 +1,68 @@
+import time
+_started = time.perf_counter()
+
 import customtkinter as ctk
 import tkinter as tk
 from tkinter import messagebox, filedialog
-from PIL import Image, ImageTk
-import re
-import webbrowser
-import geopy.geocoders
-from country_data import Country, get_currency_conversion
-from map_generator import MapView
-import requests
-from io import BytesIO
+import queue
+import sys
+import threading
+from country_data import set_offline_mode, use_country_store
+from country_store import load_country_store
+from pipeline import ExplorePipeline
+from prefetch import Prefetcher
+from flag_cache import get_flag_thumbnail, RECENT_FLAG_SIZE
+from row_pool import RowPool
+from typeahead import get_index
+from startup import load_background, warm_up
+import map_generator
+import telemetry
 
 ctk.set_appearance_mode("dark")
 ctk.set_default_color_theme("blue")
 
+# `python main.py --offline` serves every lookup from the local cache.
+if "--offline" in sys.argv:
+    set_offline_mode(True)
+# `python main.py --bulk` answers lookups from the bulk REST Countries snapshot.
+if "--bulk" in sys.argv:
+    use_country_store(load_country_store())
+# `python main.py --tile-proxy` loads map tiles through a local caching proxy (also usable offline).
+tile_proxy = None
+if "--tile-proxy" in sys.argv:
+    from tile_proxy import TileProxy
+    tile_proxy = TileProxy().start()
+    map_generator.use_tile_proxy(tile_proxy)
+
+MAX_RECENT_SEARCHES = 10
+TYPEAHEAD_DELAY_MS = 120
+UI_POLL_MS = 20
+
 recent_searches = []
 recent_flags = {}
+recent_photos = {}
+typeahead_pending = None
+currency_heading = None
+currency_rows = None
 current_map_view = None
+last_spans = {}
+status_refresh_pending = False
+# Worker threads never call Tk themselves: they queue callables here and the UI thread runs them.
+ui_calls = queue.SimpleQueue()
 
 def show_currency_conversion_table(base_currency, conversions):
     """Displays the currency conversion rates for a given base currency inside the application's GUI."""
     card.place_configure(relheight=0.85)
-    for widget in currency_frame.winfo_children():
-        widget.destroy()
+    if currency_heading is None:
+        build_currency_table()
+    currency_heading.configure(text=f"💱 Conversion Rates for 1 {base_currency}")
+    currency_rows.update(conversions.items())
 
-    heading = ctk.CTkLabel(currency_frame, text=f"💱 Conversion Rates for 1 {base_currency}",
-                           font=ctk.CTkFont(size=14, weight="bold"), text_color="white")
-    heading.pack(pady=(0, 5))
+def build_currency_table():
+    """Creates the currency heading, table and column headers once; rows come from currency_rows."""
+    global currency_heading, currency_rows
+    currency_heading = ctk.CTkLabel(currency_frame, text="", font=ctk.CTkFont(size=14, weight="bold"), text_color="white")
+    currency_heading.pack(pady=(0, 5))
 
     table_frame = ctk.CTkFrame(currency_frame, fg_color="#1e293b")
     table_frame.pack(padx=10, pady=10, fill="x")
@@ -35,98 +72,183 @@ def show_currency_conversion_table(base_currency, conversions):
     ctk.CTkLabel(headers, text="Currency", width=150, anchor="w", font=("Segoe UI", 11, "bold")).pack(side="left", padx=1)
     ctk.CTkLabel(headers, text="Rate", width=150, anchor="e", font=("Segoe UI", 11, "bold")).pack(side="left", padx=1)
 
-    for currency, rate in conversions.items():
+    def make_row():
         row = ctk.CTkFrame(table_frame, fg_color="#1e293b")
-        row.pack(fill="x", pady=2)
-        ctk.CTkLabel(row, text=currency, width=150, anchor="w", font=("Segoe UI", 11)).pack(side="left", padx=1)
-        ctk.CTkLabel(row, text=rate, width=150, anchor="e", font=("Segoe UI", 11)).pack(side="left", padx=1)
+        row.currency_label = ctk.CTkLabel(row, text="", width=150, anchor="w", font=("Segoe UI", 11))
+        row.currency_label.pack(side="left", padx=1)
+        row.rate_label = ctk.CTkLabel(row, text="", width=150, anchor="e", font=("Segoe UI", 11))
+        row.rate_label.pack(side="left", padx=1)
+        return row
+
+    def fill_row(row, item):
+        currency, rate = item
+        row.currency_label.configure(text=currency)
+        row.rate_label.configure(text=rate)
+
+    currency_rows = RowPool(make_row, fill_row, fill="x", pady=2)
 
 def explore_country():
-    """Fetches country data, displays the map, flag, currency info, and updates recent searches in the interface."""
-    global current_map_view
+    """Starts fetching country data in the background; the map, flag, currency info and recent searches fill in as each result arrives."""
     card.place_configure(relheight=0.6)
 
     country_name = entry_country.get().strip()
     if not country_name:
         messagebox.showerror("Input Error", "Enter a country name.")
         return
-    if country_name.lower() == "uk":
-        country_name = "gb"
-    country = Country.fetch_country(country_name)
-    if not country:
-        messagebox.showerror("Not Found", "Country not found.")
+    hide_suggestions()
+    explore_pipeline.start(
+        get_index().lookup_name(country_name),
+        view_var.get(),
+        on_country=show_country,
+        on_flag=update_flag,
+        on_map=show_map,
+        on_currency=show_currency_conversion_table,
+        on_error=messagebox.showerror
+    )
+
+def on_entry_key(event):
+    """Debounces typing: suggestions are refreshed once the user pauses for TYPEAHEAD_DELAY_MS."""
+    global typeahead_pending
+    if event.keysym in ("Return", "Escape", "Down", "Up"):
         return
-
-    geolocator = geopy.geocoders.Nominatim(user_agent="geoapi")
-    location = geolocator.geocode(country.name)
-    if not location:
-        messagebox.showerror("Location Error", "Could not locate the country.")
+    if typeahead_pending is not None:
+        root.after_cancel(typeahead_pending)
+    typeahead_pending = root.after(TYPEAHEAD_DELAY_MS, show_suggestions)
+
+def show_suggestions():
+    """Lists the countries matching the entry text under the entry box; returns whether there were any."""
+    global typeahead_pending
+    typeahead_pending = None
+    suggestions = get_index().suggest(entry_country.get())
+    if not suggestions:
+        hide_suggestions()
+        return False
+    suggestion_list.delete(0, tk.END)
+    for name in suggestions:
+        suggestion_list.insert(tk.END, name)
+    suggestion_list.configure(height=len(suggestions))
+    suggestion_list.place(in_=entry_country, relx=0, rely=1, relwidth=1)
+    suggestion_list.lift()
+    return True
+
+def hide_suggestions():
+    suggestion_list.place_forget()
+
+def focus_suggestions(event):
+    """Moves the keyboard focus from the entry box to the first suggestion."""
+    if suggestion_list.winfo_ismapped():
+        suggestion_list.focus_set()
+        suggestion_list.selection_clear(0, tk.END)
+        suggestion_list.selection_set(0)
+        suggestion_list.activate(0)
+
+def pick_suggestion(event):
+    """Puts the chosen suggestion into the entry box and explores it."""
+    selection = suggestion_list.curselection()
+    if not selection:
         return
+    entry_country.delete(0, tk.END)
+    entry_country.insert(0, suggestion_list.get(selection[0]))
+    entry_country.focus_set()
+    explore_country()
 
-    map_view = MapView(country.name, location.latitude, location.longitude, map_type=view_var.get())
-    map_view.generate_map(country)
-    map_view.open_in_browser()
-    current_map_view = map_view
-
+def show_country(country):
+    """Adds a resolved country to the recent searches and shows its name beside the (still loading) flag."""
     if country.name not in recent_searches:
         recent_searches.insert(0, country.name)
         recent_flags[country.name] = country.flag_url
-        if len(recent_searches) > 3:
+        if len(recent_searches) > MAX_RECENT_SEARCHES:
             removed = recent_searches.pop()
             recent_flags.pop(removed, None)
+            recent_photos.pop(removed, None)
 
     update_recent_list()
-    update_flag(country.flag_url)
-
-    currency_code = re.search(r"\((.*?)\)", country.currency)
-    if currency_code:
-        conversions = get_currency_conversion(currency_code.group(1))
-        if conversions:
-            show_currency_conversion_table(currency_code.group(1), conversions)
-            
+    prefetcher.schedule(country, recent_searches)
+    flag_img_label.config(image="")
+    flag_text_label.configure(text=entry_country.get().title())
+
+def show_map(map_view):
+    """Opens a freshly generated map in the browser and makes it the one the Save button writes out."""
+    global current_map_view
+    map_view.open_in_browser()
+    current_map_view = map_view
+
 def update_recent_list():
     """Refreshes the recent search history UI with flags and country names, allowing users to reselect previous searches."""
-    for widget in recent_list_frame.winfo_children():
-        widget.destroy()
-
-    def make_click_handler(entry):
-        return lambda e: (
-            entry_country.delete(0, tk.END),
-            entry_country.insert(0, entry)
-        )
-
-    for country_name in recent_searches:
-        row = tk.Frame(recent_list_frame, bg="#1e293b")
-        row.pack(fill="x", pady=3, padx=4)
-
-        try:
-            response = requests.get(recent_flags[country_name])
-            img_data = Image.open(BytesIO(response.content)).resize((28, 18))
-            flag_img = ImageTk.PhotoImage(img_data)
-            flag_label = tk.Label(row, image=flag_img, bg="#1e293b")
-            flag_label.image = flag_img
-            flag_label.pack(side="left", padx=6)
-        except:
-            flag_label = tk.Label(row, text="🏳️", bg="#1e293b", fg="white")
-            flag_label.pack(side="left", padx=6)
-
-        name_label = tk.Label(row, text=country_name, font=("Segoe UI", 11), fg="white", bg="#1e293b", cursor="hand2")
-        name_label.pack(side="left", padx=6)
-        name_label.bind("<Button-1>", make_click_handler(country_name))
-        row.bind("<Button-1>", make_click_handler(country_name))
-
-def update_flag(url):
-    """Updates and displays the country flag image in the GUI based on the selected country's flag URL."""
+    recent_rows.update(recent_searches)
+
+def make_recent_row():
+    """Builds one recent-search row; clicking it puts the country it currently shows into the entry box."""
+    row = tk.Frame(recent_list_frame, bg="#1e293b")
+    row.flag_label = tk.Label(row, text="🏳️", bg="#1e293b", fg="white")
+    row.flag_label.pack(side="left", padx=6)
+    row.name_label = tk.Label(row, text="", font=("Segoe UI", 11), fg="white", bg="#1e293b", cursor="hand2")
+    row.name_label.pack(side="left", padx=6)
+
+    def on_click(event):
+        entry_country.delete(0, tk.END)
+        entry_country.insert(0, row.country_name)
+
+    row.name_label.bind("<Button-1>", on_click)
+    row.bind("<Button-1>", on_click)
+    return row
+
+def fill_recent_row(row, country_name):
+    """Shows a country's name and flag in a recent-search row, reusing its PhotoImage once it has one."""
+    row.country_name = country_name
+    row.name_label.config(text=country_name)
+    # Thumbnails come from the flag cache only; a flag still downloading shows a placeholder.
+    flag_img = recent_photos.get(country_name)
+    if flag_img is None:
+        thumbnail = get_flag_thumbnail(recent_flags[country_name], RECENT_FLAG_SIZE, fetch=False)
+        if thumbnail is not None:
+            from PIL import ImageTk
+            flag_img = recent_photos[country_name] = ImageTk.PhotoImage(thumbnail)
+    if flag_img is not None:
+        row.flag_label.config(image=flag_img, text="")
+    else:
+        row.flag_label.config(image="", text="🏳️")
+
+def update_flag(country, image):
+    """Displays the flag thumbnail beside the country name and redraws the recent searches with it."""
+    from PIL import ImageTk
+    flag = ImageTk.PhotoImage(image)
+    flag_img_label.config(image=flag)
+    flag_img_label.image = flag
+    if country.name in recent_flags:
+        recent_rows.refresh(country.name)
+
+def on_telemetry(event):
+    """Collects timing spans from any thread and schedules at most one status bar refresh at a time."""
+    global status_refresh_pending
+    if event["event"] == "span":
+        last_spans[event["stage"]] = event["ms"]
+    if not status_refresh_pending:
+        status_refresh_pending = True
+        explore_pipeline.post(lambda: root.after(100, update_status_bar))
+
+def run_ui_calls():
+    """Runs the callables worker threads have queued in ui_calls, then checks again after UI_POLL_MS."""
     try:
-        response = requests.get(url)
-        img_data = Image.open(BytesIO(response.content)).resize((40, 25))
-        flag = ImageTk.PhotoImage(img_data)
-        flag_img_label.config(image=flag)
-        flag_img_label.image = flag
-        flag_text_label.configure(text=entry_country.get().title())
-    except:
-        flag_img_label.config(image="")
-        flag_text_label.configure(text=entry_country.get().title())
+        while True:
+            try:
+                fn = ui_calls.get_nowait()
+            except queue.Empty:
+                break
+            fn()
+    finally:
+        root.after(UI_POLL_MS, run_ui_calls)
+
+def update_status_bar():
+    """Shows the latest time spent in each Explore stage plus cache hit/miss and HTTP retry counts."""
+    global status_refresh_pending
+    status_refresh_pending = False
+    counters = telemetry.snapshot()
+    hits = sum(value for name, value in counters.items() if name.endswith(".hit"))
+    misses = sum(value for name, value in counters.items() if name.endswith(".miss"))
+    stages = "  ·  ".join(f"{stage} {ms:.0f} ms" for stage, ms in last_spans.items())
+    status_bar.configure(text=f"{stages}   |   cache {hits} hit / {misses} miss   |   retries {counters.get('http.retries', 0)}")
+
 def save_map():
     """Opens a file dialog to allow the user to save the currently generated interactive map as an HTML file."""
     global current_map_view
@@ -137,7 +259,18 @@ def save_map():
     if filepath:
         current_map_view.save_map_as(filepath)
         messagebox.showinfo("Saved", f"Map saved at:\n{filepath}")
-        
+
+def show_background():
+    """Draws planet-earth.png behind the card once the window is up, from a copy pre-scaled to the screen."""
+    from PIL import ImageTk
+    bg_photo = ImageTk.PhotoImage(load_background("planet-earth.png", (screen_width, screen_height)))
+    bg_label.configure(image=bg_photo)
+    bg_label.image = bg_photo
+
+def record_startup():
+    """Reports how long the window took to appear as a "startup" timing span."""
+    telemetry.record("startup", time.perf_counter() - _started)
+
 # UI setup
 root = ctk.CTk()
 root.title("🌍 Globe IO")
@@ -145,9 +278,13 @@ screen_width = root.winfo_screenwidth()
 screen_height = root.winfo_screenheight()
 root.geometry(f"{screen_width}x{screen_height}")
 
-bg_image = Image.open("planet-earth.png")
-bg_photo = ImageTk.PhotoImage(bg_image)
-bg_label = tk.Label(root, image=bg_photo)
+# Network fetches run on worker threads; results are queued for the UI thread (see run_ui_calls).
+explore_pipeline = ExplorePipeline(ui_calls.put)
+# Neighbours and recent searches are warmed in the background whenever no Explore is running.
+prefetcher = Prefetcher(explore_pipeline)
+
+# The background is filled in after the first frame is drawn (see show_background).
+bg_label = tk.Label(root, bg="#0f172a")
 bg_label.place(x=0, y=0, relwidth=1, relheight=1)
 
 card = ctk.CTkFrame(root, fg_color="#0f172a", border_color="#38bdf8", border_width=3)
@@ -159,6 +296,16 @@ title.pack(pady=15)
 entry_country = ctk.CTkEntry(card, width=320, font=ctk.CTkFont(size=13), placeholder_text="Enter Country Name")
 entry_country.pack(pady=10)
 entry_country.bind("<Return>", lambda event: explore_country())
+entry_country.bind("<KeyRelease>", on_entry_key)
+entry_country.bind("<Down>", focus_suggestions)
+entry_country.bind("<Escape>", lambda event: hide_suggestions())
+
+# As-you-type suggestions from the local country index; nothing is fetched until one resolves.
+suggestion_list = tk.Listbox(card, bg="#1e293b", fg="white", selectbackground="#0ea5e9", activestyle="none",
+                             font=("Segoe UI", 11), highlightthickness=0, borderwidth=0)
+suggestion_list.bind("<ButtonRelease-1>", pick_suggestion)
+suggestion_list.bind("<Return>", pick_suggestion)
+suggestion_list.bind("<Escape>", lambda event: (hide_suggestions(), entry_country.focus_set()))
 
 recent_label = ctk.CTkLabel(card, text="🔘 Recent Searches", font=("Segoe UI",15, "bold"), text_color="white")
 recent_label.pack()
@@ -185,6 +332,7 @@ def on_frame_configure(event):
     recent_canvas.configure(scrollregion=recent_canvas.bbox("all"))
 
 recent_list_frame.bind("<Configure>", on_frame_configure)
+recent_rows = RowPool(make_recent_row, fill_recent_row, fill="x", pady=3, padx=4)
 
 flag_frame = ctk.CTkFrame(card, fg_color="#0f172a")
 flag_frame.pack(pady=4)
@@ -219,7 +367,24 @@ save_btn.pack(side="left", padx=6)
 currency_frame = ctk.CTkFrame(card, fg_color="#0f172a")
 currency_frame.pack(pady=5, fill="both", expand=False)
 
+# `python main.py --status-bar` shows per-stage timings and cache/retry counters along the bottom edge.
+if "--status-bar" in sys.argv:
+    status_bar = ctk.CTkLabel(root, text="", anchor="w", font=("Segoe UI", 11), text_color="#94a3b8", fg_color="#0f172a")
+    status_bar.place(relx=0, rely=1, anchor="sw", relwidth=1)
+    telemetry.add_listener(on_telemetry)
+
+# Show the window first; the background image and the heavy imports (folium, pycountry,
+# requests) load afterwards so the first Explore does not pay for them either.
+root.after_idle(record_startup)
+root.after(0, show_background)
+root.after(0, run_ui_calls)
+threading.Thread(target=warm_up, daemon=True).start()
+
 root.mainloop()
+prefetcher.stop()
+explore_pipeline.shutdown()
+if tile_proxy is not None:
+    tile_proxy.stop()
 
 
 
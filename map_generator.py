@@ -1,77 +1,68 @@
-import folium
-from folium import IFrame
+import atexit
+import hashlib
+import json
+import os
+import pathlib
+import tempfile
+import threading
+from collections import OrderedDict
 import shutil
 import webbrowser
-from folium.plugins import MiniMap
+from telemetry import incr, span
 
-def create_map(country_name, latitude, longitude, country_info, view_type="Hybrid"):
-    """Generates an interactive HTML map using Folium with a marker, country details, fun fact card, minimap, and tile layer."""
-    tiles_dict = {
-        "Roadmap": "http://mt1.google.com/vt/lyrs=m&x={x}&y={y}&z={z}",
-        "Satellite": "http://mt1.google.com/vt/lyrs=s&x={x}&y={y}&z={z}",
-        "Hybrid": "http://mt1.google.com/vt/lyrs=y&x={x}&y={y}&z={z}",
-        "Default": "OpenStreetMap"
-    }
-    selected_tile = tiles_dict.get(view_type, "OpenStreetMap")
+# Rendered maps keyed by (country, coordinates, view type, data version), least recently used evicted first.
+MAP_CACHE_SIZE = 32
+_map_cache = OrderedDict()
+_map_cache_lock = threading.Lock()
+map_cache_stats = {"hits": 0, "misses": 0, "evictions": 0}
 
-    country_map = folium.Map(
-        location=[latitude, longitude],
-        zoom_start=6,
-        tiles=selected_tile if view_type == "Default" else None,
-        min_zoom=2,
-        max_zoom=18,
-        max_bounds=True,
-        no_wrap=True
-    )
+_preview_folder = None
 
-    if view_type != "Default":
-        folium.TileLayer(
-            tiles=selected_tile,
-            attr="Google Maps",
-            name=f"{view_type} View",
-            control=True,
-            no_wrap=True
-        ).add_to(country_map)
-    minimap = MiniMap(toggle_display=True, position="bottomright", width=150, height=150)
-    country_map.add_child(minimap)
-    flag_url = country_info.get("Flag", "")
-    flag_img_html = f'<div style="text-align:center;"><img src="{flag_url}" alt="Flag" style="width:80px;margin:8px auto;border-radius:4px;"></div>' if flag_url.startswith("http") else ""
-    wiki_url = f"https://en.wikipedia.org/wiki/{country_info['Name'].replace(' ', '_')}"
-    fun_fact = country_info.get("Fun Fact", "No fun fact available.")
-    card_html = f'''
+# Optional tile_proxy.TileProxy; when set, maps load their tiles through it instead of the tile servers.
+_tile_proxy = None
+TILE_LAYERS = {"Roadmap": "roadmap", "Satellite": "satellite", "Hybrid": "hybrid", "Default": "osm"}
+OSM_ATTRIBUTION = "&copy; OpenStreetMap contributors"
+
+# Country outlines (see boundaries.py) are embedded at the detail of the zoom a map opens at.
+COUNTRY_ZOOM = 6
+ATLAS_ZOOM = 2
+OUTLINE_STYLE = {"color": "#0078d7", "weight": 2, "fillColor": "#38bdf8", "fillOpacity": 0.1}
+
+# Compiled once, on first use; create_map only fills in the per-country values.
+_CARD_TEMPLATE_SOURCE = '''
     <html>
     <head>
     <style>
     /* Blue close button styling for Leaflet popup */
-    .leaflet-popup-close-button {{
+    .leaflet-popup-close-button {
       color: #0078d7 !important;
       font-size: 20px !important;
       font-weight: bold !important;
       padding-right: 6px;
-    }}
-    .leaflet-popup-close-button:hover {{
+    }
+    .leaflet-popup-close-button:hover {
       color: #005a9e !important;
-    }}
+    }
 
 
-    html, body {{
+    html, body {
       margin: 0;
       padding: 0;
-    }}
-    .flip-card {{
+    }
+    .flip-card {
       width: 260px;
       height: 360px;
       perspective: 1000px;
       margin: 0 auto;
-    }}
-    .flip-card-inner {{
+    }
+    .flip-card-inner {
       width: 100%;
       height: 100%;
       transition: transform 0.8s;
       transform-style: preserve-3d;
       position: relative;
-    }}
-    .flip-card-front, .flip-card-back {{
+    }
+    .flip-card-front, .flip-card-back {
       position: absolute;
       width: 100%;
       height: 100%;
@@ -81,30 +72,30 @@ def create_map(country_name, latitude, longitude, country_info, view_type="Hybri
       padding: 12px;
       font-family: 'Segoe UI', sans-serif;
       box-shadow: 0 4px 10px rgba(0,0,0,0.15);
-    }}
-    .flip-card-front {{
+    }
+    .flip-card-front {
       background-color: white;
       color: black;
       border: 2px solid #003366;
-    }}
-    .flip-card-back {{
+    }
+    .flip-card-back {
       background-color: #f0f8ff;
       transform: rotateY(180deg);
       border: 2px solid #003366;
-    }}
-    h4 {{
+    }
+    h4 {
       font-size: 16px;
       text-align: center;
       margin: 4px 0;
       color: #003366;
       font-weight: bold;
-    }}
-    p {{
+    }
+    p {
       font-size:15px;
       margin: 4px 0;
       padding: 2px;
-    }}
-    .flip-btn {{
+    }
+    .flip-btn {
       display: block;
       margin: 12px auto 0;
       padding: 6px 10px;
@@ -115,40 +106,40 @@ def create_map(country_name, latitude, longitude, country_info, view_type="Hybri
       border: none;
       border-radius: 5px;
       cursor: pointer;
-    }}
-    a {{
+    }
+    a {
       font-size: 12px;
       color: #1e90ff;
       font-weight: bold;
       text-decoration: none;
-    }}
+    }
     </style>
     <script>
-    function flipCard(btn) {{
+    function flipCard(btn) {
         const cardInner = btn.closest('.flip-card').querySelector('.flip-card-inner');
         cardInner.style.transform = 
           cardInner.style.transform === "rotateY(180deg)" ? "rotateY(0deg)" : "rotateY(180deg)";
-    }}
+    }
     </script>
     </head>
     <body>
     <div class="flip-card">
       <div class="flip-card-inner">
         <div class="flip-card-front">
-          {flag_img_html}
-          <h4>{country_info['Name']}</h4>
-          <p><b>Capital:</b> {country_info['Capital']}</p>
-          <p><b>Region:</b> {country_info['Region']}</p>
-          <p><b>Population:</b> {country_info['Population']:,}</p>
-          <p><b>Area:</b> {country_info['Area']} km²</p>
-          <p><b>Currency:</b> {country_info['Currency']}</p>
-          <p><b>Timezone:</b> {country_info['Timezone']}</p>
+          {{ flag_img_html }}
+          <h4>{{ name }}</h4>
+          <p><b>Capital:</b> {{ capital }}</p>
+          <p><b>Region:</b> {{ region }}</p>
+          <p><b>Population:</b> {{ population }}</p>
+          <p><b>Area:</b> {{ area }} km²</p>
+          <p><b>Currency:</b> {{ currency }}</p>
+          <p><b>Timezone:</b> {{ timezone }}</p>
           <button class="flip-btn" onclick="flipCard(this)">Show Fun Fact</button>
         </div>
         <div class="flip-card-back">
           <h4><u>Fun Fact</u></h4>
-          <p>{fun_fact}</p>
-          <p style="text-align:right;"><a href="{wiki_url}" target="_blank">📚 Read More On Wikipedia</a></p>
+          <p>{{ fun_fact }}</p>
+          <p style="text-align:right;"><a href="{{ wiki_url }}" target="_blank">📚 Read More On Wikipedia</a></p>
           <button class="flip-btn" onclick="flipCard(this)">Back</button>
         </div>
       </div>
@@ -156,6 +147,141 @@ def create_map(country_name, latitude, longitude, country_info, view_type="Hybri
     </body>
     </html>
     '''
+_card_template = None
+
+
+def data_version(country_info):
+    """Short fingerprint of the country data, so edited data never reuses a stale rendered map."""
+    payload = json.dumps(country_info, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha1(payload).hexdigest()[:16]
+
+
+def map_cache_info():
+    """Snapshot of the rendered-map cache counters and current size."""
+    with _map_cache_lock:
+        return dict(map_cache_stats, size=len(_map_cache), max_size=MAP_CACHE_SIZE)
+
+
+def clear_map_cache():
+    """Drop every rendered map and reset the counters."""
+    with _map_cache_lock:
+        _map_cache.clear()
+        map_cache_stats.update(hits=0, misses=0, evictions=0)
+
+
+def use_tile_proxy(proxy):
+    """Route the tile layers of maps rendered from now on through proxy, or straight to the tile servers with None."""
+    global _tile_proxy
+    _tile_proxy = proxy
+    clear_map_cache()
+
+
+def create_map(country_name, latitude, longitude, country_info, view_type="Hybrid", output_path="map.html"):
+    """Generates an interactive HTML map using Folium with a marker, country details, fun fact card, minimap, and tile layer."""
+    html = get_map_html(country_name, latitude, longitude, country_info, view_type)
+    with open(output_path, "w", encoding="utf-8") as f:
+        f.write(html)
+
+
+def get_map_html(country_name, latitude, longitude, country_info, view_type="Hybrid"):
+    """Returns the map HTML for a country, from the rendered-map cache when possible."""
+    cache_key = (country_name, latitude, longitude, view_type, data_version(country_info))
+    with _map_cache_lock:
+        html = _map_cache.get(cache_key)
+        if html is not None:
+            _map_cache.move_to_end(cache_key)
+            map_cache_stats["hits"] += 1
+        else:
+            map_cache_stats["misses"] += 1
+    incr(f"cache.map.{'miss' if html is None else 'hit'}")
+    if html is None:
+        with span("map_render", country=country_name, view=view_type):
+            html = render_map(latitude, longitude, country_info, view_type)
+        with _map_cache_lock:
+            _map_cache[cache_key] = html
+            while len(_map_cache) > MAP_CACHE_SIZE:
+                _map_cache.popitem(last=False)
+                map_cache_stats["evictions"] += 1
+    return html
+
+
+def _base_map(location, zoom_start, view_type):
+    """A folium.Map centred on location with the tile layer for view_type (through the tile proxy when set)."""
+    import folium
+    tiles_dict = {
+        "Roadmap": "http://mt1.google.com/vt/lyrs=m&x={x}&y={y}&z={z}",
+        "Satellite": "http://mt1.google.com/vt/lyrs=s&x={x}&y={y}&z={z}",
+        "Hybrid": "http://mt1.google.com/vt/lyrs=y&x={x}&y={y}&z={z}",
+        "Default": "OpenStreetMap"
+    }
+    selected_tile = tiles_dict.get(view_type, "OpenStreetMap")
+    if _tile_proxy is not None:
+        selected_tile = _tile_proxy.url_template(TILE_LAYERS.get(view_type, "osm"))
+
+    base_map = folium.Map(
+        location=location,
+        zoom_start=zoom_start,
+        tiles=selected_tile if view_type == "Default" else None,
+        attr=OSM_ATTRIBUTION if view_type == "Default" and _tile_proxy is not None else None,
+        min_zoom=2,
+        max_zoom=18,
+        max_bounds=True,
+        no_wrap=True
+    )
+
+    if view_type != "Default":
+        folium.TileLayer(
+            tiles=selected_tile,
+            attr="Google Maps",
+            name=f"{view_type} View",
+            control=True,
+            no_wrap=True
+        ).add_to(base_map)
+    return base_map
+
+
+def _outlines(codes, zoom):
+    """GeoJSON outlines of the countries with these ISO alpha-2 codes for one zoom level, or None without a dataset."""
+    from boundaries import get_boundaries
+    boundaries = get_boundaries()
+    if boundaries is None:
+        return None
+    collection = boundaries.features([code for code in codes if code], zoom)
+    return collection if collection["features"] else None
+
+
+def render_map(latitude, longitude, country_info, view_type="Hybrid"):
+    """Builds the Folium map for one country and returns it as an HTML string."""
+    # folium and jinja2 are imported here, not at module load, so the GUI can open before they are needed.
+    global _card_template
+    import folium
+    from folium import IFrame
+    from folium.plugins import MiniMap
+    if _card_template is None:
+        from jinja2 import Template
+        _card_template = Template(_CARD_TEMPLATE_SOURCE)
+    country_map = _base_map([latitude, longitude], COUNTRY_ZOOM, view_type)
+    minimap_tiles = None
+    if _tile_proxy is not None:
+        minimap_tiles = folium.TileLayer(_tile_proxy.url_template("osm"), attr=OSM_ATTRIBUTION)
+    minimap = MiniMap(tile_layer=minimap_tiles, toggle_display=True, position="bottomright", width=150, height=150)
+    country_map.add_child(minimap)
+    flag_url = country_info.get("Flag", "")
+    flag_img_html = f'<div style="text-align:center;"><img src="{flag_url}" alt="Flag" style="width:80px;margin:8px auto;border-radius:4px;"></div>' if flag_url.startswith("http") else ""
+    wiki_url = f"https://en.wikipedia.org/wiki/{country_info['Name'].replace(' ', '_')}"
+    fun_fact = country_info.get("Fun Fact", "No fun fact available.")
+    card_html = _card_template.render(
+        flag_img_html=flag_img_html,
+        name=country_info['Name'],
+        capital=country_info['Capital'],
+        region=country_info['Region'],
+        population=f"{country_info['Population']:,}",
+        area=country_info['Area'],
+        currency=country_info['Currency'],
+        timezone=country_info['Timezone'],
+        fun_fact=fun_fact,
+        wiki_url=wiki_url
+    )
     iframe = IFrame(card_html, width=280, height=390)
     folium.Marker(
         location=[latitude, longitude],
@@ -163,22 +289,122 @@ def create_map(country_name, latitude, longitude, country_info, view_type="Hybri
         tooltip=f"{country_info['Name']} Info",
         icon=folium.Icon(color="blue", icon="info-sign")
     ).add_to(country_map)
+    outline = _outlines([country_info.get("Code")], COUNTRY_ZOOM)
+    if outline:
+        folium.GeoJson(outline, name="Borders", style_function=lambda feature: OUTLINE_STYLE).add_to(country_map)
 
     folium.LayerControl(position="topright", collapsed=False).add_to(country_map)
-    country_map.save("map.html")
+    return country_map.get_root().render()
+
+
+# Atlas popups are built in the browser from one shared data blob, so the card markup and styles
+# appear once per page instead of once per marker.
+ATLAS_FIELDS = ("Name", "Capital", "Region", "Population", "Area", "Currency", "Timezone", "Flag")
+_ATLAS_ASSETS = """
+<style>
+.globeio-card { width: 240px; font-family: 'Segoe UI', sans-serif; }
+.globeio-card img { display: block; width: 80px; margin: 4px auto 8px; border-radius: 4px; }
+.globeio-card h4 { font-size: 16px; text-align: center; margin: 4px 0; color: #003366; font-weight: bold; }
+.globeio-card p { font-size: 14px; margin: 3px 0; }
+.globeio-card a { font-size: 12px; color: #1e90ff; font-weight: bold; text-decoration: none; }
+</style>
+<script>
+function globeioCard(index) {
+    var fields = globeioAtlas.fields, row = globeioAtlas.rows[index], country = {};
+    fields.forEach(function (field, i) { country[field] = row[i]; });
+    var card = document.createElement("div");
+    card.className = "globeio-card";
+    if (/^https?:/.test(country.Flag || "")) {
+        var flag = document.createElement("img");
+        flag.src = country.Flag;
+        flag.alt = "Flag";
+        card.appendChild(flag);
+    }
+    var title = document.createElement("h4");
+    title.textContent = country.Name;
+    card.appendChild(title);
+    ["Capital", "Region", "Population", "Area", "Currency", "Timezone"].forEach(function (field) {
+        var line = document.createElement("p"), label = document.createElement("b");
+        label.textContent = field + ": ";
+        line.appendChild(label);
+        var value = country[field];
+        line.appendChild(document.createTextNode(typeof value === "number" ? value.toLocaleString() : value));
+        card.appendChild(line);
+    });
+    var link = document.createElement("a");
+    link.href = "https://en.wikipedia.org/wiki/" + encodeURIComponent(country.Name.replace(/ /g, "_"));
+    link.target = "_blank";
+    link.textContent = "Read more on Wikipedia";
+    card.appendChild(link);
+    return card;
+}
+</script>
+"""
+_ATLAS_MARKER = """
+function (row) {
+    var marker = L.marker(new L.LatLng(row[0], row[1]), {title: globeioAtlas.rows[row[2]][0]});
+    marker.bindPopup(function () { return globeioCard(row[2]); }, {maxWidth: 280});
+    return marker;
+}
+"""
+
+
+def render_atlas(country_infos, view_type="Default", outlines=False):
+    """Builds one clustered map of every country_info dict with coordinates and returns it as an HTML string."""
+    import folium
+    from folium.plugins import FastMarkerCluster
+    markers, rows = [], []
+    for info in country_infos:
+        coordinates = info.get("Coordinates")
+        if not coordinates or coordinates[0] is None:
+            continue
+        markers.append([coordinates[0], coordinates[1], len(rows)])
+        rows.append([info.get(field) for field in ATLAS_FIELDS])
+
+    atlas = _base_map([20, 0], ATLAS_ZOOM, view_type)
+    blob = json.dumps({"fields": ATLAS_FIELDS, "rows": rows}, separators=(",", ":")).replace("</", "<\\/")
+    atlas.get_root().header.add_child(folium.Element(f"<script>var globeioAtlas = {blob};</script>{_ATLAS_ASSETS}"))
+    outline = _outlines([info.get("Code") for info in country_infos], ATLAS_ZOOM) if outlines else None
+    if outline:
+        folium.GeoJson(outline, name="Borders", style_function=lambda feature: OUTLINE_STYLE).add_to(atlas)
+    FastMarkerCluster(markers, callback=_ATLAS_MARKER, name="Countries").add_to(atlas)
+    folium.LayerControl(position="topright", collapsed=False).add_to(atlas)
+    return atlas.get_root().render()
+
+
+def create_atlas(country_infos, view_type="Default", output_path="atlas.html", outlines=False):
+    """Writes the clustered atlas of country_infos to output_path and returns the number of countries placed."""
+    country_infos = list(country_infos)
+    with span("atlas_render", countries=len(country_infos), view=view_type):
+        html = render_atlas(country_infos, view_type, outlines)
+    with open(output_path, "w", encoding="utf-8") as f:
+        f.write(html)
+    return sum(1 for info in country_infos if info.get("Coordinates"))
+
+
+def _preview_dir():
+    """Per-process temp folder for browser previews, removed when the program exits."""
+    global _preview_folder
+    if _preview_folder is None:
+        _preview_folder = tempfile.mkdtemp(prefix="globeio-")
+        atexit.register(shutil.rmtree, _preview_folder, ignore_errors=True)
+    return _preview_folder
 
 
 # NEW CLASS: MapView
 class MapView:
-    """Handles map generation and rendering logic for a country."""
+    """Handles map generation and rendering logic for a country; the rendered HTML is kept in memory."""
 
     def __init__(self, country_name, latitude, longitude, map_type="Hybrid"):
         self._country_name = country_name
         self._latitude = latitude
         self._longitude = longitude
         self._map_type = map_type
-    def generate_map(self, country):
-        """Creates a country-specific map using provided country metadata."""
+        self._html = None
+        self._preview_path = None
+        self._area = None
+    def generate_map(self, country, output_path=None):
+        """Creates a country-specific map using provided country metadata, optionally writing it to output_path."""
         country_info = {
             "Name": country.name,
             "Capital": country.capital,
@@ -188,14 +414,35 @@ class MapView:
             "Currency": country.currency,
             "Timezone": country.timezone,
             "Flag": country.flag_url,
-            "Fun Fact": country.fun_fact
+            "Fun Fact": country.fun_fact,
+            "Code": country.code
         }
-        create_map(self._country_name, self._latitude, self._longitude, country_info, self._map_type)
+        self._area = country.area
+        self._html = get_map_html(self._country_name, self._latitude, self._longitude, country_info, self._map_type)
+        self._preview_path = None
+        if output_path:
+            self.save_map_as(output_path)
     def open_in_browser(self):
-        """Opens the most recently generated map (map.html) in the user's default web browser."""
-        webbrowser.open("map.html", new=0)
+        """Writes the map to this view's own temp file and opens it in the user's default web browser."""
+        if _tile_proxy is not None:
+            _tile_proxy.prewarm(self._latitude, self._longitude, {TILE_LAYERS.get(self._map_type, "osm"), "osm"},
+                                area=self._area)
+        if self._preview_path is None:
+            fd, self._preview_path = tempfile.mkstemp(suffix=".html", dir=_preview_dir())
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(self._get_html())
+        webbrowser.open(pathlib.Path(self._preview_path).as_uri(), new=0)
 
     def save_map_as(self, new_path):
-        """Saves the generated map HTML file to a new location specified by the user."""
-        shutil.copy("map.html", new_path)
+        """Saves the generated map HTML to a new location specified by the user."""
+        html = self._get_html()
+        # A saved map outlives this process, so it must not depend on the local tile proxy.
+        if _tile_proxy is not None:
+            html = _tile_proxy.to_upstream(html)
+        with open(new_path, "w", encoding="utf-8") as f:
+            f.write(html)
 
+    def _get_html(self):
+        if self._html is None:
+            raise ValueError("No map has been generated yet; call generate_map() first.")
+        return self._html
@@ -0,0 +1,185 @@
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from country_data import Country, get_fun_fact, get_coordinates, get_currency_conversion
+from flag_cache import get_flag_thumbnail, HEADER_FLAG_SIZE
+from map_generator import MapView
+from single_flight import SingleFlight
+from telemetry import incr, record
+
+# Shared by every pipeline and the prefetcher, so duplicate Explores (Enter plus a click, a double-clicked
+# recent row, a country being prefetched) wait on the fetch already running instead of repeating it.
+flights = SingleFlight()
+
+
+class ExploreRun:
+    """One Explore request; becomes stale as soon as a newer run is started."""
+
+    def __init__(self, pipeline, generation, country_name, view_type, callbacks):
+        self.pipeline = pipeline
+        self.generation = generation
+        self.country_name = country_name
+        self.view_type = view_type
+        self.callbacks = callbacks
+        self.futures = []
+        self.started = time.perf_counter()
+        self.finished = False
+
+    def is_current(self):
+        """True while no newer Explore has been started."""
+        return self.pipeline.current_generation == self.generation
+
+    def submit(self, fn, *args):
+        """Run fn on the pipeline's thread pool unless this run has gone stale."""
+        if not self.is_current():
+            return None
+        try:
+            future = self.pipeline.executor.submit(fn, *args)
+        except RuntimeError:
+            return None  # the pipeline has been shut down
+        self.futures.append(future)
+        return future
+
+    def submit_after(self, dependencies, fn, *args):
+        """Submit fn once every future in dependencies has finished, without tying up a worker while waiting."""
+        remaining = [len(dependencies)]
+        lock = threading.Lock()
+
+        def on_done(_):
+            with lock:
+                remaining[0] -= 1
+                ready = remaining[0] == 0
+            if ready and not any(f.cancelled() for f in dependencies):
+                self.submit(fn, *args)
+
+        for future in dependencies:
+            future.add_done_callback(on_done)
+
+    def post(self, name, *args):
+        """Deliver a result to the UI thread, dropping it if this run has been superseded."""
+        callback = self.callbacks.get(name)
+        if callback is None:
+            return
+
+        def deliver():
+            if self.is_current():
+                callback(*args)
+
+        self.pipeline.post(deliver)
+
+    def cancel(self):
+        """Cancel every fetch of this run that has not started yet."""
+        for future in self.futures:
+            future.cancel()
+
+    def finish(self, name, *args):
+        """Post the run's final result (the map or an error) and mark it finished."""
+        self.finished = True
+        self.post(name, *args)
+
+
+class ExplorePipeline:
+    """Runs the Explore fetches on a thread pool and posts each result back to the UI thread as it arrives.
+
+    post(fn) must schedule fn on the UI thread, e.g. ``lambda fn: root.after(0, fn)``.
+    Results are delivered through the callbacks passed to start():
+    on_country(country), on_flag(country, image), on_map(map_view), on_currency(base, conversions)
+    and on_error(title, message).
+    """
+
+    def __init__(self, post, max_workers=6):
+        self.post = post
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="explore")
+        self.current_generation = 0
+        self._current_run = None
+        self._lock = threading.Lock()
+
+    def start(self, country_name, view_type="Hybrid", **callbacks):
+        """Start exploring country_name, cancelling any Explore still in flight.
+
+        Starting the same country and view again while it is still loading returns the running Explore.
+        """
+        with self._lock:
+            current = self._current_run
+            if (current is not None and not current.finished and current.view_type == view_type
+                    and current.country_name.strip().lower() == country_name.strip().lower()):
+                incr("explore.deduplicated")
+                return current
+            if current is not None:
+                current.cancel()
+            self.current_generation += 1
+            run = ExploreRun(self, self.current_generation, country_name, view_type, callbacks)
+            self._current_run = run
+        run.submit(self._resolve_country, run)
+        return run
+
+    def idle(self):
+        """True when no user-started Explore has work queued or running."""
+        run = self._current_run
+        return run is None or (run.finished and all(future.done() for future in list(run.futures)))
+
+    def shutdown(self):
+        """Stop accepting work and cancel anything queued."""
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def _resolve_country(self, run):
+        """Fetch the country record, then fan out the independent fetches that depend on it."""
+        try:
+            country = flights.do(("country", run.country_name.strip().lower()),
+                                 Country.fetch_country, run.country_name, with_fun_fact=False)
+        except Exception as e:
+            run.finish("on_error", "Network Error", f"Could not fetch country data: {e}")
+            return
+        if not country:
+            run.finish("on_error", "Not Found", "Country not found.")
+            return
+        run.post("on_country", country)
+
+        if country.flag_url:
+            run.submit(self._load_flag, run, country)
+        currency_code = re.search(r"\((.*?)\)", country.currency)
+        if currency_code:
+            run.submit(self._convert_currency, run, currency_code.group(1))
+        fun_fact = run.submit(flights.do, ("fun_fact", country.name), get_fun_fact, country.name)
+        location = run.submit(get_coordinates, country)
+        if fun_fact and location:
+            run.submit_after([fun_fact, location], self._render_map, run, country, fun_fact, location)
+
+    def _load_flag(self, run, country):
+        # Decoding warms every thumbnail size, so the recent searches list can redraw from memory.
+        try:
+            image = flights.do(("flag", country.flag_url), get_flag_thumbnail, country.flag_url, HEADER_FLAG_SIZE)
+        except Exception as e:
+            incr("explore.flag_failed")
+            run.post("on_error", "Flag Error", f"Could not load the flag: {e}")
+            return
+        if image is not None:
+            run.post("on_flag", country, image)
+
+    def _convert_currency(self, run, base_currency):
+        try:
+            conversions = flights.do(("currency", base_currency), get_currency_conversion, base_currency)
+        except Exception as e:
+            incr("explore.currency_failed")
+            run.post("on_error", "Currency Error", f"Could not fetch exchange rates: {e}")
+            return
+        if conversions:
+            run.post("on_currency", base_currency, conversions)
+
+    def _render_map(self, run, country, fun_fact, location):
+        """Build the map once both the Wikipedia summary and the coordinates are in."""
+        coordinates = location.result() if location.exception() is None else None
+        if not coordinates:
+            run.finish("on_error", "Location Error", "Could not locate the country.")
+            return
+        country.fun_fact = fun_fact.result() if fun_fact.exception() is None else "No fun facts available."
+        try:
+            map_view = MapView(country.name, coordinates[0], coordinates[1], map_type=run.view_type)
+            map_view.generate_map(country)
+        except Exception as e:
+            incr("explore.map_failed")
+            run.finish("on_error", "Map Error", f"Could not build the map: {e}")
+            return
+        record("explore", time.perf_counter() - run.started, country=country.name)
+        run.finish("on_map", map_view)
@@ -0,0 +1,98 @@
+import re
+import threading
+from country_data import Country, get_currency_conversion, get_fun_fact
+from flag_cache import HEADER_FLAG_SIZE, get_flag_thumbnail
+from pipeline import flights
+from telemetry import incr
+
+# Countries warmed after each Explore: its neighbours first, then the recent searches.
+PREFETCH_BUDGET = 6
+IDLE_POLL_SECONDS = 0.05
+
+
+class Prefetcher:
+    """Warms the caches for the countries a user is likely to explore next, on one background thread.
+
+    Every step waits until the ExplorePipeline is idle, so a user-started Explore always goes first,
+    and fetches go through the pipeline's single-flight layer, so an Explore for a country being
+    prefetched joins that fetch instead of repeating it.
+    """
+
+    def __init__(self, pipeline, budget=PREFETCH_BUDGET):
+        self.pipeline = pipeline
+        self.budget = budget
+        self._queue = []
+        self._warmed = set()
+        self._condition = threading.Condition()
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name="prefetch", daemon=True)
+        self._thread.start()
+
+    def candidates(self, country, recent=()):
+        """Names to warm after exploring country: its bordering countries (alpha-3 codes) and recent searches."""
+        names = []
+        for name in list(country.borders) + list(recent):
+            key = name.strip().lower()
+            if key and key != country.name.lower() and key not in self._warmed and name not in names:
+                names.append(name)
+        return names[:self.budget]
+
+    def schedule(self, country, recent=()):
+        """Replace the pending prefetches with the likely next countries after country."""
+        with self._condition:
+            self._queue = self.candidates(country, recent)
+            self._condition.notify()
+
+    def pending(self):
+        with self._condition:
+            return list(self._queue)
+
+    def stop(self):
+        with self._condition:
+            self._stopped = True
+            self._queue = []
+            self._condition.notify()
+
+    def _next(self):
+        """Block until there is a candidate and the pipeline is idle; None once stopped."""
+        with self._condition:
+            while not self._stopped and not (self._queue and self.pipeline.idle()):
+                self._condition.wait(IDLE_POLL_SECONDS if self._queue else None)
+            return None if self._stopped else self._queue.pop(0)
+
+    def _yield_to_user(self):
+        """Wait while a user-started Explore is running; False if the prefetcher was stopped meanwhile."""
+        with self._condition:
+            while not self._stopped and not self.pipeline.idle():
+                self._condition.wait(IDLE_POLL_SECONDS)
+            return not self._stopped
+
+    def _run(self):
+        while True:
+            name = self._next()
+            if name is None:
+                return
+            try:
+                self.warm(name)
+            except Exception:
+                incr("prefetch.failed")
+
+    def warm(self, name):
+        """Fetch a country's data, flag thumbnails, summary and exchange rates into the caches."""
+        country = flights.do(("country", name.strip().lower()), Country.fetch_country, name, with_fun_fact=False)
+        if not country:
+            return
+        self._warmed.add(name.strip().lower())
+        self._warmed.add(country.name.lower())
+        steps = []
+        if country.flag_url:
+            steps.append((("flag", country.flag_url), get_flag_thumbnail, country.flag_url, HEADER_FLAG_SIZE))
+        steps.append((("fun_fact", country.name), get_fun_fact, country.name))
+        currency_code = re.search(r"\((.*?)\)", country.currency)
+        if currency_code:
+            steps.append((("currency", currency_code.group(1)), get_currency_conversion, currency_code.group(1)))
+        for key, fn, *args in steps:
+            if not self._yield_to_user():
+                return
+            flights.do(key, fn, *args)
+        incr("prefetch.warmed")
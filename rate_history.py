@@ -0,0 +1,141 @@
+"""Local history of the USD-quoted exchange rate tables, for conversion matrices and "as of" lookups.
+
+Run e.g.: python rate_history.py matrix EUR GBP JPY USD --as-of 2026-01-31
+"""
+import argparse
+import json
+import threading
+import time
+from datetime import date, datetime
+from cache import DEFAULT_DB_PATH, open_db
+
+
+def _timestamp(moment, end_of_day=True):
+    """Epoch seconds for None (now), a number, a date, a datetime or an ISO date/time string.
+
+    A plain date ("2026-01-31") means the end of that day, so "as of" it includes every table fetched on it,
+    or its start when end_of_day is false.
+    """
+    if moment is None:
+        return time.time()
+    if isinstance(moment, (int, float)):
+        return float(moment)
+    if isinstance(moment, str):
+        try:
+            moment = date.fromisoformat(moment)
+        except ValueError:
+            moment = datetime.fromisoformat(moment)
+    if not isinstance(moment, datetime):
+        moment = datetime.combine(moment, datetime.max.time() if end_of_day else datetime.min.time())
+    return moment.timestamp()
+
+
+class RateHistory:
+    """Every USD rate table fetched, as (fetched_at, currency codes, float64 rates) rows in SQLite."""
+
+    def __init__(self, db_path=None):
+        self._db_path = db_path or DEFAULT_DB_PATH
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connect(self):
+        if self._conn is None:
+            self._conn = open_db(
+                self._db_path,
+                "CREATE TABLE IF NOT EXISTS rate_snapshots (fetched_at REAL PRIMARY KEY, currencies TEXT, rates BLOB)",
+            )
+        return self._conn
+
+    def record(self, rates, fetched_at=None):
+        """Store one USD-quoted table ({"GBP": 0.79, ...}); a table already stored for fetched_at is kept."""
+        import numpy as np
+        codes = sorted(rates)
+        values = np.array([rates[code] for code in codes], dtype=np.float64)
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR IGNORE INTO rate_snapshots (fetched_at, currencies, rates) VALUES (?, ?, ?)",
+                (_timestamp(fetched_at), json.dumps(codes), values.tobytes()),
+            )
+            conn.commit()
+
+    def _row_to_rates(self, row):
+        import numpy as np
+        return row[0], dict(zip(json.loads(row[1]), np.frombuffer(row[2], dtype=np.float64).tolist()))
+
+    def snapshot(self, as_of=None):
+        """(fetched_at, {currency: USD rate}) of the latest table stored at or before as_of, or None."""
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT fetched_at, currencies, rates FROM rate_snapshots WHERE fetched_at <= ? "
+                "ORDER BY fetched_at DESC LIMIT 1",
+                (_timestamp(as_of),),
+            ).fetchone()
+        return self._row_to_rates(row) if row else None
+
+    def __len__(self):
+        with self._lock:
+            return self._connect().execute("SELECT COUNT(*) FROM rate_snapshots").fetchone()[0]
+
+    def matrix(self, currencies, as_of=None):
+        """N×N array where [i, j] is the amount of currencies[j] one unit of currencies[i] buys; NaN if unknown.
+
+        Every cell comes from the same stored table, so the matrix is consistent; None when nothing is stored.
+        """
+        import numpy as np
+        found = self.snapshot(as_of)
+        if found is None:
+            return None
+        rates = found[1]
+        usd = np.array([rates.get(code, np.nan) for code in currencies], dtype=np.float64)
+        return usd[np.newaxis, :] / usd[:, np.newaxis]
+
+    def series(self, base, quote, start=None, end=None):
+        """(fetched_at, rate) arrays of how many quote one base bought in every stored table between start and end."""
+        import numpy as np
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT fetched_at, currencies, rates FROM rate_snapshots WHERE fetched_at BETWEEN ? AND ? "
+                "ORDER BY fetched_at",
+                (_timestamp(start, end_of_day=False) if start is not None else 0.0, _timestamp(end)),
+            ).fetchall()
+        times, values = [], []
+        for row in rows:
+            fetched_at, rates = self._row_to_rates(row)
+            if base in rates and quote in rates:
+                times.append(fetched_at)
+                values.append(rates[quote] / rates[base])
+        return np.array(times, dtype=np.float64), np.array(values, dtype=np.float64)
+
+
+def format_matrix(currencies, matrix):
+    """The matrix as a text table, one row per currency."""
+    lines = ["      " + "".join(f"{code:>12}" for code in currencies)]
+    for code, row in zip(currencies, matrix):
+        lines.append(f"{code:<6}" + "".join(f"{value:>12.4f}" for value in row))
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    """Command line entry point: `python rate_history.py matrix CODES... [--as-of DATE]`."""
+    parser = argparse.ArgumentParser(description="Stored exchange rate history.")
+    parser.add_argument("command", choices=["matrix", "status"])
+    parser.add_argument("currencies", nargs="*", default=["USD", "EUR", "GBP", "JPY"])
+    parser.add_argument("--as-of", help="date (end of that day) or date-time, e.g. 2026-01-31 (default: latest)")
+    args = parser.parse_args(argv)
+    history = RateHistory()
+    if args.command == "status":
+        latest = history.snapshot()
+        print(f"{len(history)} rate tables stored" + (f", latest {datetime.fromtimestamp(latest[0]):%Y-%m-%d %H:%M}" if latest else ""))
+        return 0
+    codes = [code.upper() for code in args.currencies]
+    matrix = history.matrix(codes, args.as_of)
+    if matrix is None:
+        print("No exchange rates stored for that date.")
+        return 1
+    print(format_matrix(codes, matrix))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
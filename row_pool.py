@@ -0,0 +1,36 @@
+class RowPool:
+    """A list of reusable row widgets that are re-filled in place instead of destroyed and rebuilt.
+
+    make_row() builds one row widget, fill_row(row, item) shows an item in it. Rows beyond the
+    current item count are hidden with pack_forget and kept for the next, longer list.
+    """
+
+    def __init__(self, make_row, fill_row, **pack_options):
+        self.rows = []
+        self._make_row = make_row
+        self._fill_row = fill_row
+        self._pack_options = pack_options
+        self._items = []
+
+    def update(self, items):
+        """Show items, one per row; a row whose item did not change is left untouched."""
+        items = list(items)
+        for index, item in enumerate(items):
+            if index == len(self.rows):
+                self.rows.append(self._make_row())
+            row = self.rows[index]
+            if index >= len(self._items):
+                self._fill_row(row, item)
+                row.pack(**self._pack_options)
+            elif self._items[index] != item:
+                self._fill_row(row, item)
+        # Hidden rows are always a suffix, so re-packing them later keeps the on-screen order.
+        for row in self.rows[len(items):len(self._items)]:
+            row.pack_forget()
+        self._items = items
+
+    def refresh(self, item):
+        """Fill every visible row showing item again, e.g. once its flag has downloaded."""
+        for row, shown in zip(self.rows, self._items):
+            if shown == item:
+                self._fill_row(row, item)
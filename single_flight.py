@@ -0,0 +1,38 @@
+import threading
+from concurrent.futures import Future
+from telemetry import incr
+
+
+class SingleFlight:
+    """Collapses concurrent identical calls: the first caller for a key runs it, later ones wait and share the outcome."""
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn, *args, **kwargs):
+        """Return fn(*args, **kwargs), or the result of the call already running for key (re-raising its error)."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = Future()
+        if not leader:
+            incr("singleflight.shared")
+            return call.result()
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            call.set_exception(e)
+            raise
+        else:
+            call.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+    def in_flight(self):
+        """Number of keys with a call currently running."""
+        with self._lock:
+            return len(self._calls)
@@ -0,0 +1,47 @@
+import os
+from cache import CACHE_DIR
+
+# Cold-start budget (seconds) for importing the modules main.py needs before the window can appear.
+# test_startup.py fails when a heavy dependency creeps back into that path.
+IMPORT_BUDGET = 0.3
+
+# Imported by warm_up() on a background thread once the window is showing.
+HEAVY_MODULES = ("folium", "folium.plugins", "jinja2", "pycountry", "requests", "PIL.Image")
+
+
+def background_cache_path(size):
+    """Where the background image pre-scaled to size is cached."""
+    width, height = size
+    return os.path.join(CACHE_DIR, f"background_{width}x{height}.png")
+
+
+def load_background(source, size):
+    """Return source scaled to cover size, decoding the full-resolution file only when no scaled copy is cached."""
+    from PIL import Image
+    cached_path = background_cache_path(size)
+    if os.path.exists(cached_path) and os.path.getmtime(cached_path) >= os.path.getmtime(source):
+        return Image.open(cached_path)
+    image = Image.open(source)
+    width, height = size
+    scale = max(width / image.width, height / image.height)
+    scaled = image.resize((max(width, round(image.width * scale)), max(height, round(image.height * scale))))
+    left, top = (scaled.width - width) // 2, (scaled.height - height) // 2
+    image = scaled.crop((left, top, left + width, top + height))
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp_path = f"{cached_path}.{os.getpid()}.tmp"
+    image.save(tmp_path, format="PNG")
+    os.replace(tmp_path, cached_path)
+    return image
+
+
+def warm_up():
+    """Import the heavy modules and build the country name and typeahead indexes so the first Explore does not pay for them."""
+    import importlib
+    import country_data
+    import http_client
+    import typeahead
+    for name in HEAVY_MODULES:
+        importlib.import_module(name)
+    country_data.warm_name_index()
+    typeahead.get_index()
+    http_client.get_session()
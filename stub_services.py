@@ -0,0 +1,176 @@
+"""Local stand-ins for REST Countries, ExchangeRate, Wikipedia, Nominatim and the flag CDN.
+
+Each service can be given a fixed latency (seconds) and a failure rate (0..1) so benchmarks
+can measure Globe IO offline, e.g.::
+
+    with StubServices(latency={"restcountries": 0.08}, failure_rate={"exchangerate": 0.1}) as stubs:
+        stubs.configure_app()
+        Country.fetch_country("Japan")
+"""
+import csv
+import json
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+from urllib.parse import parse_qs, unquote, urlparse
+import pycountry
+from PIL import Image
+
+SERVICES = ("restcountries", "exchangerate", "wikipedia", "nominatim", "flags")
+CURRENCIES = ("USD", "EUR", "GBP", "JPY", "INR", "CNY", "BRL", "CAD", "AUD", "CHF")
+CENTROIDS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "country_centroids.csv")
+
+
+def build_country_records():
+    """Deterministic REST Countries-shaped records for every ISO 3166 country."""
+    with open(CENTROIDS_PATH, newline="", encoding="utf-8") as f:
+        centroids = {row["country"]: [float(row["latitude"]), float(row["longitude"])] for row in csv.DictReader(f)}
+    records = []
+    for i, country in enumerate(pycountry.countries):
+        official = getattr(country, "official_name", country.name)
+        currency = CURRENCIES[i % len(CURRENCIES)]
+        records.append({
+            "cca2": country.alpha_2,
+            "cca3": country.alpha_3,
+            "name": {"common": country.name, "official": official},
+            "altSpellings": [country.alpha_2, official],
+            "capital": [f"Capital of {country.name}"],
+            "region": "Stubland",
+            "population": 1000 + i * 7919,
+            "area": 100.0 + i * 13,
+            "currencies": {currency: {"name": f"{currency} dollar", "symbol": "$"}},
+            "timezones": ["UTC"],
+            "latlng": centroids.get(country.alpha_2),
+            "borders": [],
+        })
+    return records
+
+
+def _flag_png():
+    """A small PNG used for every flag."""
+    buffer = BytesIO()
+    Image.new("RGB", (320, 200), (200, 30, 40)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+class StubServices:
+    """A threaded local HTTP server that answers like the upstream services Globe IO calls."""
+
+    def __init__(self, latency=None, failure_rate=None, seed=0, host="127.0.0.1", port=0):
+        self.latency = dict.fromkeys(SERVICES, 0.0)
+        self.latency.update(latency or {})
+        self.failure_rate = dict.fromkeys(SERVICES, 0.0)
+        self.failure_rate.update(failure_rate or {})
+        self.requests = dict.fromkeys(SERVICES, 0)
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._records = build_country_records()
+        self._by_name = {}
+        for record in self._records:
+            for key in (record["name"]["common"], record["name"]["official"], record["cca2"], record["cca3"]):
+                self._by_name.setdefault(key.lower(), []).append(record)
+        self._flag = _flag_png()
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def url(self, service):
+        """Base URL of one stubbed service."""
+        return f"{self.base_url}/{service}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def configure_app(self):
+        """Point country_data's upstream endpoints at this server."""
+        import country_data
+        country_data.REST_COUNTRIES_URL = f"{self.url('restcountries')}/v3.1"
+        country_data.EXCHANGE_RATE_URL = self.url("exchangerate")
+        country_data.WIKIPEDIA_API_URL = f"{self.url('wikipedia')}/{{language}}/w/api.php"
+        country_data.NOMINATIM_DOMAIN = f"{self.base_url.split('://', 1)[1]}/nominatim"
+        country_data.NOMINATIM_SCHEME = "http"
+
+    def _should_fail(self, service):
+        with self._lock:
+            self.requests[service] += 1
+            return self._random.random() < self.failure_rate[service]
+
+    def _make_handler(self):
+        stubs = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                parsed = urlparse(self.path)
+                service, _, rest = parsed.path.lstrip("/").partition("/")
+                if service not in SERVICES:
+                    return self._send(404, {"error": "unknown service"})
+                time.sleep(stubs.latency[service])
+                if stubs._should_fail(service):
+                    if service == "exchangerate":
+                        return self._send(200, {"success": False, "error": {"code": 104, "info": "quota reached"}})
+                    return self._send(503, {"error": "injected failure"})
+                getattr(stubs, f"_answer_{service}")(self, "/" + rest, parse_qs(parsed.query))
+
+            def _send(self, status, payload, content_type="application/json"):
+                body = payload if isinstance(payload, bytes) else json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
+
+    def _answer_restcountries(self, handler, path, query):
+        if path == "/v3.1/all":
+            fields = query.get("fields", [""])[0].split(",")
+            return handler._send(200, [{k: v for k, v in r.items() if k in fields or not fields[0]} for r in self._records])
+        name = unquote(path.rsplit("/", 1)[-1]).lower()
+        matches = self._by_name.get(name)
+        if not matches:
+            return handler._send(404, {"status": 404, "message": "Not Found"})
+        flag_url = f"{self.url('flags')}/{{}}.png"
+        return handler._send(200, [dict(r, flags={"png": flag_url.format(r["cca2"].lower())}) for r in matches])
+
+    def _answer_exchangerate(self, handler, path, query):
+        quotes = {f"USD{code}": 1.0 + i * 0.37 for i, code in enumerate(CURRENCIES)}
+        handler._send(200, {"success": True, "source": "USD", "quotes": quotes})
+
+    def _answer_wikipedia(self, handler, path, query):
+        title = query.get("titles", [""])[0]
+        extract = f"{title} is a country used by the Globe IO benchmarks. " * 12
+        handler._send(200, {"query": {"pages": {"1": {"pageid": 1, "title": title, "extract": extract}}}})
+
+    def _answer_nominatim(self, handler, path, query):
+        name = query.get("q", [""])[0].lower()
+        matches = self._by_name.get(name)
+        if not matches or not matches[0]["latlng"]:
+            return handler._send(200, [])
+        lat, lon = matches[0]["latlng"]
+        handler._send(200, [{"lat": str(lat), "lon": str(lon), "display_name": matches[0]["name"]["common"]}])
+
+    def _answer_flags(self, handler, path, query):
+        handler._send(200, self._flag, content_type="image/png")
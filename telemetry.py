@@ -0,0 +1,85 @@
+import json
+import logging
+import os
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+logger = logging.getLogger("globeio.timing")
+
+counters = Counter()
+_counter_lock = threading.Lock()
+_listeners = []
+
+
+def enable_json_log(path):
+    """Append every span and counter update to path as one JSON object per line."""
+    handler = logging.FileHandler(path, encoding="utf-8")
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    return handler
+
+
+def add_listener(listener):
+    """Call listener(event) for every emitted event, e.g. to feed a status bar."""
+    _listeners.append(listener)
+
+
+def remove_listener(listener):
+    if listener in _listeners:
+        _listeners.remove(listener)
+
+
+def emit(event):
+    """Send one event dict to the JSON-lines log and to every listener."""
+    event.setdefault("ts", round(time.time(), 3))
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(json.dumps(event, default=str))
+    for listener in list(_listeners):
+        listener(event)
+
+
+def record(stage, seconds, ok=True, **fields):
+    """Emit a timing span that was measured elsewhere."""
+    emit({"event": "span", "stage": stage, "ms": round(seconds * 1000, 2), "ok": ok, **fields})
+
+
+@contextmanager
+def span(stage, **fields):
+    """Time the enclosed block and emit it as a span; ok is False if the block raised."""
+    start = time.perf_counter()
+    ok = True
+    try:
+        yield fields
+    except BaseException:
+        ok = False
+        raise
+    finally:
+        record(stage, time.perf_counter() - start, ok, **fields)
+
+
+def incr(name, amount=1):
+    """Increase a named counter such as "cache.restcountries.hit" or "http.retries"."""
+    with _counter_lock:
+        counters[name] += amount
+        value = counters[name]
+    if _listeners or logger.isEnabledFor(logging.INFO):
+        emit({"event": "counter", "name": name, "value": value})
+
+
+def snapshot():
+    """Copy of every counter."""
+    with _counter_lock:
+        return dict(counters)
+
+
+def reset():
+    """Zero every counter."""
+    with _counter_lock:
+        counters.clear()
+
+
+if os.getenv("GLOBEIO_TIMING_LOG"):
+    enable_json_log(os.environ["GLOBEIO_TIMING_LOG"])
@@ -0,0 +1,55 @@
+import json
+import math
+import boundaries
+import map_generator
+from boundaries import BoundaryStore, tolerance_for_zoom
+
+def _circle(cx, cy, radius, points):
+    ring = [[cx + radius * math.cos(2 * math.pi * i / points), cy + radius * math.sin(2 * math.pi * i / points)]
+            for i in range(points)]
+    return ring + [ring[0]]
+
+def _write_dataset(path):
+    """A GeoJSON file with one detailed country (with a lake) and one tiny island country."""
+    collection = {"type": "FeatureCollection", "features": [
+        {"type": "Feature", "properties": {"ISO_A2": "-99", "ISO_A2_EH": "FR"},
+         "geometry": {"type": "Polygon", "coordinates": [_circle(2, 46, 5, 2000), _circle(2, 46, 1, 400)]}},
+        {"type": "Feature", "properties": {"ISO_A2": "MC"},
+         "geometry": {"type": "MultiPolygon", "coordinates": [[_circle(7.4, 43.7, 0.01, 40)]]}},
+    ]}
+    path.write_text(json.dumps(collection), encoding="utf-8")
+    return str(path)
+
+def test_detail_grows_with_zoom(tmp_path):
+    """Test that coarser levels hold fewer points, holes survive, and tiny countries never vanish."""
+    store = BoundaryStore.load(_write_dataset(tmp_path / "boundaries.geojson"))
+    counts = [store.point_count(tolerance) for tolerance in boundaries.TOLERANCES]
+    assert counts == sorted(set(counts)) and counts[-1] < 2400 // 4
+    assert tolerance_for_zoom(2) > tolerance_for_zoom(6) > tolerance_for_zoom(12)
+    france = store.geometry("fr", zoom=6)
+    assert len(france["coordinates"]) == 1 and len(france["coordinates"][0]) == 2
+    assert store.geometry("MC", zoom=0)["coordinates"]
+    assert store.geometry("XX", zoom=6) is None
+
+def test_simplified_outlines_cached_on_disk(tmp_path, monkeypatch):
+    """Test that the second load reads the packed .npz instead of re-simplifying the GeoJSON."""
+    source = _write_dataset(tmp_path / "boundaries.geojson")
+    first = BoundaryStore.load(source)
+    assert (tmp_path / "boundaries.npz").exists()
+    monkeypatch.setattr(BoundaryStore, "from_geojson", classmethod(lambda cls, collection: 1 / 0))
+    assert BoundaryStore.load(source).geometry("FR", zoom=4) == first.geometry("FR", zoom=4)
+
+def test_country_map_embeds_outline(tmp_path, monkeypatch):
+    """Test that a country map carries its outline at the detail of its opening zoom only."""
+    from country_data import Country
+    store = BoundaryStore.load(_write_dataset(tmp_path / "boundaries.geojson"))
+    monkeypatch.setattr(boundaries, "_boundaries", store)
+    view = map_generator.MapView("France", 46.0, 2.0, "Default")
+    view.generate_map(Country("France", "Paris", "Europe", 1, 1, "Euro (EUR) €", "UTC+01:00", "", "A fact.", code="FR"))
+    html = view._get_html()
+    ring = lambda geometry: {tuple(point) for point in geometry["coordinates"][0][0]}
+    shown = ring(store.geometry("FR", zoom=map_generator.COUNTRY_ZOOM))
+    finest_only = ring(store.geometry("FR", tolerance=boundaries.TOLERANCES[-1])) - shown
+    assert "Borders" in html
+    assert all(str(x) in html for x, _ in list(shown)[:5])
+    assert not any(str(x) in html for x, _ in list(finest_only)[:5])
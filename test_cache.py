@@ -0,0 +1,38 @@
+from cache import TTLCache
+
+def test_cache_roundtrip(tmp_path):
+    """Test that a stored value is returned from the cache."""
+    cache = TTLCache("test", ttl=60, db_path=str(tmp_path / "cache.sqlite3"))
+    cache.set("japan", {"Name": "Japan"})
+    assert cache.get("japan") == {"Name": "Japan"}
+
+def test_cache_persists_to_disk(tmp_path):
+    """Test that a second cache on the same file sees entries written by the first."""
+    db_path = str(tmp_path / "cache.sqlite3")
+    TTLCache("test", ttl=60, db_path=db_path).set("japan", [1, 2, 3])
+    assert TTLCache("test", ttl=60, db_path=db_path).get("japan") == [1, 2, 3]
+
+def test_cache_expiry(tmp_path):
+    """Test that expired entries are hidden unless allow_expired is set."""
+    cache = TTLCache("test", ttl=60, db_path=str(tmp_path / "cache.sqlite3"))
+    cache.set("japan", "old", ttl=-1)
+    assert cache.get("japan") is None
+    assert cache.get("japan", allow_expired=True) == "old"
+
+def test_cache_memory_eviction(tmp_path):
+    """Test that the memory tier is bounded but evicted entries are still served from disk."""
+    cache = TTLCache("test", ttl=60, db_path=str(tmp_path / "cache.sqlite3"), max_memory_entries=2)
+    for i in range(5):
+        cache.set(str(i), i)
+    assert len(cache._memory) == 2
+    assert cache.get("0") == 0
+
+def test_cache_disk_eviction(tmp_path):
+    """Test that the disk tier drops the entries nearest expiry once it exceeds max_disk_entries."""
+    db_path = str(tmp_path / "cache.sqlite3")
+    cache = TTLCache("test", ttl=60, db_path=db_path, max_disk_entries=3)
+    for i in range(5):
+        cache.set(str(i), i, ttl=60 + i)
+    fresh = TTLCache("test", ttl=60, db_path=db_path)
+    assert fresh.get("0") is None
+    assert fresh.get("4") == 4
@@ -0,0 +1,79 @@
+import pytest
+from circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError, get_breaker, reset_all
+from telemetry import snapshot
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class _Response:
+    def __init__(self, status_code):
+        self.status_code = status_code
+
+
+def test_opens_after_consecutive_failures():
+    """Test that the breaker opens after failure_threshold failures in a row and then rejects calls."""
+    breaker = CircuitBreaker("test_open", failure_threshold=3, reset_timeout=30, clock=_Clock())
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+    assert snapshot()["breaker.test_open.rejected"] >= 1
+
+
+def test_half_open_trial_closes_or_reopens():
+    """Test that after the timeout one trial call goes through and its outcome decides the state."""
+    clock = _Clock()
+    breaker = CircuitBreaker("test_half_open", failure_threshold=1, reset_timeout=30, clock=clock)
+    breaker.record_failure()
+    clock.now = 29.0
+    assert not breaker.allow()
+    clock.now = 30.0
+    assert breaker.allow()
+    assert breaker.state == HALF_OPEN
+    assert not breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert breaker.retry_in() == 30.0
+    clock.now = 60.0
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    assert breaker.allow()
+
+
+def test_guard_records_errors_and_bad_statuses():
+    """Test that guard() counts exceptions and 5xx/429 responses, but not a 404, and fails fast once open."""
+    breaker = CircuitBreaker("test_guard", failure_threshold=2, reset_timeout=30, clock=_Clock())
+    with breaker.guard() as call:
+        call.check(_Response(404))
+    assert breaker.failures == 0
+    with breaker.guard() as call:
+        call.check(_Response(503))
+    with pytest.raises(ConnectionError):
+        with breaker.guard():
+            raise ConnectionError("down")
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpenError, match="test_guard is unavailable"):
+        with breaker.guard():
+            pass
+
+
+def test_shared_breakers_reset():
+    """Test that get_breaker returns one breaker per upstream and reset_all closes them."""
+    breaker = get_breaker("exchangerate")
+    assert get_breaker("exchangerate") is breaker
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    reset_all()
+    assert breaker.state == CLOSED and breaker.allow()
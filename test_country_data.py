@@ -1,4 +1,5 @@
 from country_data import normalize_country_name, Country
+from rate_history import RateHistory
 
 def test_normalize_name():
     """Test that an ISO alpha-2 country code returns the correct country name."""
@@ -24,3 +25,222 @@ def test_country_fetch_population():
     """Test that the population value returned for France is greater than 0."""
     country = Country.fetch_country("France")
     assert country.population > 0
+
+def test_normalize_name_uk_alias():
+    """Test that the "uk" abbreviation resolves to the United Kingdom."""
+    assert normalize_country_name(" UK ") == "United Kingdom"
+
+def test_normalize_name_matches_linear_scan():
+    """Test that the lookup index agrees with a full scan of pycountry for every code and name."""
+    import pycountry
+    for country in pycountry.countries:
+        for key in (country.alpha_2, country.alpha_3, country.name):
+            assert normalize_country_name(key.lower()) == country.name
+
+class _FakeResponse:
+    """Minimal stand-in for a requests.Response carrying a JSON payload."""
+
+    def __init__(self, payload, status_code=200):
+        self._payload = payload
+        self.status_code = status_code
+
+    def json(self):
+        return self._payload
+
+JAPAN_RECORD = {
+    "name": {"common": "Japan", "official": "Japan"},
+    "altSpellings": ["JP", "Nippon"],
+    "capital": ["Tokyo"],
+    "region": "Asia",
+    "population": 125836021,
+    "area": 377930.0,
+    "currencies": {"JPY": {"name": "Japanese yen", "symbol": "¥"}},
+    "timezones": ["UTC+09:00"],
+    "flags": {"png": "https://flagcdn.com/w320/jp.png"},
+    "cca2": "JP",
+    "latlng": [36.0, 138.0],
+}
+
+def _use_temp_caches(monkeypatch, tmp_path):
+    """Point the country caches at a throwaway SQLite file and stub out Wikipedia."""
+    import country_data
+    from cache import TTLCache
+    db_path = str(tmp_path / "cache.sqlite3")
+    monkeypatch.setattr(country_data, "_rest_cache", TTLCache("restcountries", 60, db_path=db_path))
+    monkeypatch.setattr(country_data, "_country_info_cache", TTLCache("country_info", 60, db_path=db_path))
+    monkeypatch.setattr(country_data, "get_fun_fact", lambda name: "A fun fact.")
+    return country_data
+
+def test_country_fetch_uses_cache(monkeypatch, tmp_path):
+    """Test that a repeat lookup is served from the cache without another REST call."""
+    country_data = _use_temp_caches(monkeypatch, tmp_path)
+    calls = []
+    monkeypatch.setattr(country_data.http_client, "get", lambda url, **kwargs: calls.append(url) or _FakeResponse([JAPAN_RECORD]))
+    assert Country.fetch_country("Japan").capital == "Tokyo"
+    assert Country.fetch_country("jp").capital == "Tokyo"
+    assert len(calls) == 1
+
+def test_iso_code_looked_up_by_alpha(monkeypatch, tmp_path):
+    """Test that an ISO code is fetched from /alpha, since the pycountry name it maps to may not match on /name."""
+    country_data = _use_temp_caches(monkeypatch, tmp_path)
+    calls = []
+    monkeypatch.setattr(country_data.http_client, "get", lambda url, **kwargs: calls.append(url) or _FakeResponse([JAPAN_RECORD]))
+    assert Country.fetch_country("JPN").name == "Japan"
+    Country.fetch_country("Nippon")
+    assert calls[0].endswith("/alpha/JPN")
+    assert calls[1].endswith("/name/Nippon")
+
+def test_fallback_fun_fact_not_stored(monkeypatch, tmp_path):
+    """Test that a fun fact missing during one lookup is fetched again on the next instead of being cached."""
+    country_data = _use_temp_caches(monkeypatch, tmp_path)
+    monkeypatch.setattr(country_data.http_client, "get", lambda url, **kwargs: _FakeResponse([JAPAN_RECORD]))
+    monkeypatch.setattr(country_data, "get_fun_fact", lambda name: "No fun facts available.")
+    assert Country.fetch_country("Japan").fun_fact == "No fun facts available."
+    monkeypatch.setattr(country_data, "get_fun_fact", lambda name: "Japan is an island country.")
+    assert Country.fetch_country("Japan").fun_fact == "Japan is an island country."
+
+def test_country_fetch_offline(monkeypatch, tmp_path):
+    """Test that offline mode answers from the cache and never touches the network."""
+    country_data = _use_temp_caches(monkeypatch, tmp_path)
+    monkeypatch.setattr(country_data.http_client, "get", lambda url, **kwargs: _FakeResponse([JAPAN_RECORD]))
+    Country.fetch_country("Japan")
+    monkeypatch.setattr(country_data.http_client, "get", lambda url, **kwargs: 1 / 0)
+    monkeypatch.setattr(country_data, "OFFLINE", True)
+    assert Country.fetch_country("Japan").name == "Japan"
+    assert Country.fetch_country("France") is None
+
+def test_unknown_country_negatively_cached(monkeypatch, tmp_path):
+    """Test that a 404 from REST Countries is remembered, so retyping the name makes no second call."""
+    country_data = _use_temp_caches(monkeypatch, tmp_path)
+    calls = []
+    monkeypatch.setattr(country_data.http_client, "get", lambda url, **kwargs: calls.append(url) or _FakeResponse({"status": 404}, 404))
+    assert Country.fetch_country("Xyzland") is None
+    assert Country.fetch_country("xyzland") is None
+    assert len(calls) == 1
+
+def test_failing_rest_countries_skipped(monkeypatch, tmp_path):
+    """Test that after repeated 5xx answers REST Countries is not called, and expired entries are served instead."""
+    country_data = _use_temp_caches(monkeypatch, tmp_path)
+    monkeypatch.setattr(country_data._country_info_cache, "ttl", -1)
+    monkeypatch.setattr(country_data._rest_cache, "ttl", -1)
+    monkeypatch.setattr(country_data.http_client, "get", lambda url, **kwargs: _FakeResponse([JAPAN_RECORD]))
+    Country.fetch_country("Japan")
+    calls = []
+    monkeypatch.setattr(country_data.http_client, "get", lambda url, **kwargs: calls.append(url) or _FakeResponse({}, 503))
+    for name in ("Peru", "Chile", "Kenya"):
+        assert Country.fetch_country(name) is None
+    assert Country.fetch_country("Ghana") is None
+    assert Country.fetch_country("Japan").capital == "Tokyo"
+    assert len(calls) == 3
+
+RATES_RESPONSE = {
+    "success": True,
+    "source": "USD",
+    "quotes": {"USDGBP": 0.8, "USDJPY": 150.0, "USDEUR": 0.9, "USDINR": 83.0},
+}
+
+def test_currency_conversion_single_batched_call(monkeypatch, tmp_path):
+    """Test that conversions for several bases are computed from one cached rate fetch."""
+    import country_data
+    from cache import TTLCache
+    monkeypatch.setattr(country_data, "_rates_cache", TTLCache("exchange_rates", 60, db_path=str(tmp_path / "c.sqlite3")))
+    monkeypatch.setattr(country_data, "_rate_history", RateHistory(str(tmp_path / "c.sqlite3")))
+    calls = []
+    monkeypatch.setattr(country_data.http_client, "get", lambda url, **kwargs: calls.append(url) or _FakeResponse(RATES_RESPONSE))
+    conversions = country_data.get_currency_conversion("INR")
+    assert conversions["USD"] == round(1 / 83.0, 4)
+    assert conversions["GBP"] == round(0.8 / 83.0, 4)
+    assert set(conversions) == {"USD", "GBP", "JPY", "EUR"}
+    assert country_data.get_currency_conversion("EUR", targets=["INR"]) == {"USD": round(1 / 0.9, 4), "INR": round(83.0 / 0.9, 4)}
+    assert len(calls) == 1
+
+def test_currency_targets_normalized():
+    """Test that GLOBEIO_CURRENCY_TARGETS entries are trimmed and upper-cased, and blanks are skipped."""
+    import country_data
+    assert country_data.parse_currency_codes("GBP, jpy ,,EUR,") == ["GBP", "JPY", "EUR"]
+
+def test_rates_kept_for_as_of_conversions(monkeypatch, tmp_path):
+    """Test that fetched rate tables are stored and old conversions are answered from them without a call."""
+    import country_data
+    from cache import TTLCache
+    monkeypatch.setattr(country_data, "_rates_cache", TTLCache("exchange_rates", 60, db_path=str(tmp_path / "c.sqlite3")))
+    monkeypatch.setattr(country_data, "_rate_history", RateHistory(str(tmp_path / "c.sqlite3")))
+    monkeypatch.setattr(country_data.http_client, "get", lambda url, **kwargs: _FakeResponse(dict(RATES_RESPONSE, timestamp=1_700_000_000)))
+    country_data.get_currency_conversion("EUR")
+    monkeypatch.setattr(country_data.http_client, "get", lambda url, **kwargs: 1 / 0)
+    assert country_data.get_currency_conversion("EUR", targets=["GBP"], as_of=1_700_000_500)["GBP"] == round(0.8 / 0.9, 4)
+    assert country_data.get_currency_conversion("EUR", as_of=1_600_000_000) is None
+
+def test_failed_rate_fetch_not_repeated(monkeypatch, tmp_path, capsys):
+    """Test that an exchangerate.host error answer stops further rate requests for a while."""
+    import country_data
+    from cache import TTLCache
+    monkeypatch.setattr(country_data, "_rates_cache", TTLCache("exchange_rates", 60, db_path=str(tmp_path / "c.sqlite3")))
+    calls = []
+    error = {"success": False, "error": {"code": 104, "info": "usage limit reached"}}
+    monkeypatch.setattr(country_data.http_client, "get", lambda url, **kwargs: calls.append(url) or _FakeResponse(error))
+    assert country_data.get_currency_conversion("EUR") is None
+    assert country_data.get_currency_conversion("GBP") is None
+    assert len(calls) == 1
+    assert capsys.readouterr().out.count("Failed to fetch exchange rates") == 1
+
+def test_rates_breaker_recovers_with_expired_table(monkeypatch, tmp_path):
+    """Test that a failed refresh serves the expired table, and the breaker lets a retry through after its timeout."""
+    import country_data
+    from cache import TTLCache
+    from circuit_breaker import get_breaker
+    monkeypatch.setattr(country_data, "_rates_cache", TTLCache("exchange_rates", -1, db_path=str(tmp_path / "c.sqlite3")))
+    monkeypatch.setattr(country_data, "_rate_history", RateHistory(str(tmp_path / "c.sqlite3")))
+    breaker = get_breaker("exchangerate")
+    now = [0.0]
+    monkeypatch.setattr(breaker, "_clock", lambda: now[0])
+    calls = []
+
+    def upstream(payload):
+        monkeypatch.setattr(country_data.http_client, "get", lambda url, **kwargs: calls.append(url) or _FakeResponse(payload))
+
+    upstream(RATES_RESPONSE)
+    assert country_data.get_currency_conversion("EUR")["GBP"] == round(0.8 / 0.9, 4)
+    upstream({"success": False, "error": {"code": 104, "info": "usage limit reached"}})
+    assert country_data.get_currency_conversion("EUR")["GBP"] == round(0.8 / 0.9, 4)
+    assert country_data.get_currency_conversion("EUR")["GBP"] == round(0.8 / 0.9, 4)
+    assert len(calls) == 2 and breaker.state == "open"
+    now[0] += breaker.reset_timeout
+    upstream(dict(RATES_RESPONSE, quotes={"USDGBP": 0.8, "USDEUR": 0.5}))
+    assert country_data.get_currency_conversion("EUR")["GBP"] == round(0.8 / 0.5, 4)
+    assert len(calls) == 3 and breaker.state == "closed"
+
+def test_country_carries_coordinates(monkeypatch, tmp_path):
+    """Test that the REST Countries latlng is used as the map location without geocoding."""
+    import country_data
+    _use_temp_caches(monkeypatch, tmp_path)
+    monkeypatch.setattr(country_data.http_client, "get", lambda url, **kwargs: _FakeResponse([JAPAN_RECORD]))
+    monkeypatch.setattr(country_data, "geocode_country", lambda name: 1 / 0)
+    country = Country.fetch_country("Japan")
+    assert country_data.get_coordinates(country) == (36.0, 138.0)
+
+def test_coordinates_fall_back_to_centroid_table(monkeypatch):
+    """Test that a country without latlng is located from the local centroid table."""
+    import country_data
+    monkeypatch.setattr(country_data, "geocode_country", lambda name: 1 / 0)
+    country = Country("India", "New Delhi", "Asia", 1, 1, "Indian rupee (INR) ₹", "UTC+05:30", "", "", code="IN")
+    assert country_data.get_coordinates(country) == (20.593684, 78.96288)
+    assert country_data.lookup_centroid("Japan") == (36.204824, 138.252924)
+
+def test_fun_fact_cached_and_prefetched(monkeypatch, tmp_path):
+    """Test that summaries are fetched once per title and can be warmed in bulk."""
+    import country_data
+    from cache import TTLCache
+    requested = []
+
+    def fake_intro(title, language):
+        requested.append(title)
+        return "" if title == "Atlantis" else f"{title} is a country. " * 30
+
+    monkeypatch.setattr(country_data, "_summary_cache", TTLCache("wiki_summary", 60, db_path=str(tmp_path / "c.sqlite3")))
+    monkeypatch.setattr(country_data, "_fetch_wiki_intro", fake_intro)
+    facts = country_data.prefetch_fun_facts(["Japan", "Peru", "Atlantis"])
+    assert facts["Atlantis"] == "No fun facts available."
+    assert len(facts["Japan"]) == 303
+    assert country_data.get_fun_fact("Japan") == facts["Japan"]
+    assert sorted(requested) == ["Atlantis", "Japan", "Peru"]
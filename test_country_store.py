@@ -0,0 +1,50 @@
+from country_store import CountryStore, format_age
+
+RECORDS = [
+    {"cca3": "JPN", "cca2": "JP", "name": {"common": "Japan", "official": "Japan"},
+     "altSpellings": ["JP", "Nippon", "Nihon"], "capital": ["Tokyo"], "region": "Asia",
+     "population": 125836021, "area": 377930.0, "flags": {"png": "https://flagcdn.com/w320/jp.png"},
+     "currencies": {"JPY": {"name": "Japanese yen", "symbol": "¥"}}, "timezones": ["UTC+09:00"]},
+    {"cca3": "GBR", "cca2": "GB", "name": {"common": "United Kingdom",
+     "official": "United Kingdom of Great Britain and Northern Ireland"},
+     "altSpellings": ["GB", "UK", "Great Britain"], "capital": ["London"], "region": "Europe",
+     "population": 67215293, "area": 242900.0, "flags": {"png": "https://flagcdn.com/w320/gb.png"},
+     "currencies": {"GBP": {"name": "British pound", "symbol": "£"}}, "timezones": ["UTC"]},
+]
+
+def test_store_match_by_name_code_and_alt_spelling():
+    """Test that the store indexes common names, ISO codes and alternate spellings."""
+    store = CountryStore(RECORDS)
+    assert store.match("japan")["cca3"] == "JPN"
+    assert store.match("GBR")["cca3"] == "GBR"
+    assert store.match("Great Britain")["cca3"] == "GBR"
+    assert store.match("Atlantis") is None
+
+def test_store_snapshot_roundtrip(tmp_path):
+    """Test that a saved snapshot reloads with the same records and fetch time."""
+    path = str(tmp_path / "countries.json")
+    store = CountryStore(RECORDS, fetched_at=1000.0)
+    store.save(path)
+    loaded = CountryStore.load(path)
+    assert len(loaded) == 2
+    assert loaded.fetched_at == 1000.0
+    assert loaded.age() > 0
+
+def test_store_serves_fetch_country(monkeypatch, tmp_path):
+    """Test that Country.fetch_country is answered by the store without a REST call."""
+    import country_data
+    from cache import TTLCache
+    db_path = str(tmp_path / "cache.sqlite3")
+    monkeypatch.setattr(country_data, "_rest_cache", TTLCache("restcountries", 60, db_path=db_path))
+    monkeypatch.setattr(country_data, "_country_info_cache", TTLCache("country_info", 60, db_path=db_path))
+    monkeypatch.setattr(country_data, "_country_store", CountryStore(RECORDS))
+    monkeypatch.setattr(country_data, "get_fun_fact", lambda name: "A fun fact.")
+    monkeypatch.setattr(country_data.http_client, "get", lambda *args, **kwargs: 1 / 0)
+    country = country_data.Country.fetch_country("UK")
+    assert country.capital == "London"
+    assert "GBP" in country.currency
+
+def test_format_age():
+    """Test the human-readable snapshot age."""
+    assert format_age(90) == "1m"
+    assert format_age(3 * 86400 + 4 * 3600) == "3d 4h"
@@ -0,0 +1,43 @@
+import math
+import pytest
+from country_data import Country
+from country_table import CountryTable
+
+def _record(code, name, region, population, area, currency, latlng=(0.0, 0.0)):
+    """A REST Countries-shaped record with just the fields the table reads."""
+    return {"cca2": code, "name": {"common": name}, "region": region, "population": population, "area": area,
+            "currencies": {currency: {"name": currency, "symbol": "$"}}, "timezones": ["UTC"], "latlng": list(latlng),
+            "capital": ["X"], "flags": {"png": ""}}
+
+def _table():
+    return CountryTable.from_records([
+        _record("JP", "Japan", "Asia", 125_000_000, 377_975, "JPY"),
+        _record("SG", "Singapore", "Asia", 5_600_000, 728, "SGD"),
+        _record("MN", "Mongolia", "Asia", 3_300_000, 1_564_116, "MNT"),
+        _record("FR", "France", "Europe", 68_000_000, 551_695, "EUR"),
+        _record("DE", "Germany", "Europe", 83_000_000, 357_114, "EUR"),
+        _record("AQ", "Antarctica", "Antarctic", 1000, "N/A", "N/A"),
+    ])
+
+def test_top_by_density_in_region():
+    """Test that the densest countries of one region come back in order, skipping rows without an area."""
+    table = _table()
+    top = table.rows(table.top("density", 2, mask=table.mask(region="Asia")))
+    assert [row["Name"] for row in top] == ["Singapore", "Japan"]
+    assert [row["Name"] for row in table.rows(table.top("density", 10, ascending=True))][0] == "Mongolia"
+    assert len(table.top("density", 10)) == 5
+
+def test_aggregate_by_category():
+    """Test that grouped sums, counts and maxima match the records."""
+    table = _table()
+    assert table.aggregate("population", by="region")["Europe"] == 151_000_000
+    assert table.aggregate("population", by="currency", how="count")["EUR"] == 2
+    assert table.aggregate("area", by="region", how="max")["Asia"] == 1_564_116
+    assert math.isnan(table.column("area")[5])
+    with pytest.raises(ValueError):
+        table.aggregate("area", how="median")
+
+def test_country_uses_slots():
+    """Test that Country instances carry no per-instance __dict__."""
+    country = Country("Japan", "Tokyo", "Asia", 1, 1, "Yen (JPY) ¥", "UTC+09:00", "", None)
+    assert not hasattr(country, "__dict__")
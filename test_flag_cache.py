@@ -0,0 +1,48 @@
+from io import BytesIO
+from PIL import Image
+import flag_cache
+
+class _FakeResponse:
+    """Minimal stand-in for a requests.Response carrying PNG bytes."""
+
+    def __init__(self, content):
+        self.content = content
+        self.status_code = 200
+
+def _png_bytes():
+    """A small in-memory PNG to serve as a flag."""
+    buffer = BytesIO()
+    Image.new("RGB", (320, 200), "red").save(buffer, format="PNG")
+    return buffer.getvalue()
+
+def _isolate(monkeypatch, tmp_path):
+    """Point the flag cache at a temp folder, empty its memory tier and count downloads."""
+    calls = []
+    monkeypatch.setattr(flag_cache, "FLAG_DIR", str(tmp_path))
+    monkeypatch.setattr(flag_cache, "_thumbnails", flag_cache.OrderedDict())
+    monkeypatch.setattr(flag_cache.http_client, "get", lambda url, **kwargs: calls.append(url) or _FakeResponse(_png_bytes()))
+    return calls
+
+def test_thumbnails_decoded_once_for_every_size(monkeypatch, tmp_path):
+    """Test that one download serves both GUI thumbnail sizes from memory."""
+    calls = _isolate(monkeypatch, tmp_path)
+    url = "https://flagcdn.com/w320/jp.png"
+    assert flag_cache.prefetch_flag(url)
+    assert flag_cache.get_flag_thumbnail(url, flag_cache.RECENT_FLAG_SIZE, fetch=False).size == (28, 18)
+    assert flag_cache.get_flag_thumbnail(url, flag_cache.HEADER_FLAG_SIZE).size == (40, 25)
+    assert calls == [url]
+
+def test_raw_bytes_served_from_disk(monkeypatch, tmp_path):
+    """Test that a flag downloaded once is read back from disk after the memory tier is cleared."""
+    calls = _isolate(monkeypatch, tmp_path)
+    url = "https://flagcdn.com/w320/fr.png"
+    flag_cache.get_flag_thumbnail(url, flag_cache.HEADER_FLAG_SIZE)
+    flag_cache._thumbnails.clear()
+    assert flag_cache.get_flag_thumbnail(url, flag_cache.RECENT_FLAG_SIZE, fetch=False) is not None
+    assert len(calls) == 1
+
+def test_no_fetch_for_unknown_flag(monkeypatch, tmp_path):
+    """Test that fetch=False never downloads a flag that is not cached."""
+    calls = _isolate(monkeypatch, tmp_path)
+    assert flag_cache.get_flag_thumbnail("https://flagcdn.com/w320/de.png", flag_cache.RECENT_FLAG_SIZE, fetch=False) is None
+    assert calls == []
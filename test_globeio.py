@@ -0,0 +1,70 @@
+import globeio
+from country_data import Country
+
+def _fake_fetch(name, with_fun_fact=True):
+    """Offline stand-in for Country.fetch_country."""
+    if name == "Atlantis":
+        return None
+    return Country(name, "Capital", "Region", 1000, 10.0, "Euro (EUR) €", "UTC", "", "A fun fact.",
+                   code="", latitude=10.0, longitude=20.0)
+
+def test_map_filename():
+    """Test that map file names are filesystem-safe slugs."""
+    assert globeio.map_filename("Côte d'Ivoire", "Hybrid") == "c_te_d_ivoire_hybrid.html"
+
+def test_all_reads_alpha_3_codes():
+    """Test that --all lists ISO alpha-3 codes rather than pycountry names REST Countries does not know."""
+    import argparse
+    names = globeio.read_country_names(argparse.Namespace(all=True, file=None, countries=["Peru"]))
+    assert "BOL" in names and "TWN" in names
+    assert not any("," in name for name in names)
+    assert names[-1] == "Peru"
+
+def test_batch_writes_every_map(monkeypatch, tmp_path):
+    """Test that the batch command renders one file per country and view and reports failures."""
+    monkeypatch.setattr(globeio.Country, "fetch_country", _fake_fetch)
+    report = globeio.run_batch(["Italy", "Peru", "Atlantis"], ["Default", "Hybrid"], str(tmp_path), workers=2)
+    assert report["maps"] == 4
+    assert report["failed"] == ["Atlantis"]
+    assert (tmp_path / "peru_hybrid.html").exists()
+    assert (tmp_path / "italy_default.html").exists()
+
+def test_batch_reports_errors_as_failures(monkeypatch, tmp_path):
+    """Test that a lookup or render raising an error marks that country failed and the batch carries on."""
+    from circuit_breaker import CircuitOpenError
+
+    def failing_fetch(name, with_fun_fact=True):
+        if name == "Ghana":
+            raise CircuitOpenError("restcountries", 30)
+        return _fake_fetch(name)
+
+    class _BrokenMapView(globeio.MapView):
+        def generate_map(self, country, output_path=None):
+            if country.name == "Peru":
+                raise OSError("disk full")
+            return super().generate_map(country, output_path)
+
+    monkeypatch.setattr(globeio.Country, "fetch_country", failing_fetch)
+    monkeypatch.setattr(globeio, "MapView", _BrokenMapView)
+    report = globeio.run_batch(["Italy", "Ghana", "Peru"], ["Default", "Hybrid"], str(tmp_path), workers=2)
+    assert report["maps"] == 2
+    assert sorted(report["failed"]) == ["Ghana", "Peru"]
+
+def test_atlas_filters_by_region_and_name(tmp_path, capsys):
+    """Test that the atlas command places the selected countries on one clustered map."""
+    import country_data
+    from country_store import CountryStore
+    records = [{"cca3": code, "cca2": code[:2], "name": {"common": name}, "region": region, "population": 10,
+                "area": 1.0, "latlng": [1.0, 2.0], "capital": ["C"], "currencies": {}, "timezones": ["UTC"]}
+               for code, name, region in (("JPN", "Japan", "Asia"), ("PER", "Peru", "Americas"), ("NPL", "Nepal", "Asia"))]
+    country_data.use_country_store(CountryStore(records))
+    try:
+        assert [info["Name"] for info in globeio.atlas_country_infos(country_data._country_store, ["asia"])] == ["Japan", "Nepal"]
+        output = tmp_path / "atlas.html"
+        assert globeio.main(["atlas", "--region", "Asia", "--output", str(output)]) == 0
+        html = output.read_text(encoding="utf-8")
+        assert "Nepal" in html and "Peru" not in html
+        assert html.count("globeio-card {") == 1
+        assert "2 countries" in capsys.readouterr().out
+    finally:
+        country_data.use_country_store(None)
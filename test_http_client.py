@@ -0,0 +1,70 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+import http_client
+import telemetry
+
+class _Handler(BaseHTTPRequestHandler):
+    """Fails the first request to /flaky and /slow-down and supports ETag revalidation on /etag."""
+
+    hits = {}
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        count = _Handler.hits[self.path] = _Handler.hits.get(self.path, 0) + 1
+        if self.path == "/flaky" and count == 1:
+            return self._send(503, b"busy")
+        if self.path == "/slow-down" and count == 1:
+            return self._send(429, b"later", {"Retry-After": "3600"})
+        if self.path == "/etag" and self.headers.get("If-None-Match") == '"v1"':
+            return self._send(304, b"", {"ETag": '"v1"'})
+        self._send(200, b"hello", {"ETag": '"v1"'} if self.path == "/etag" else {})
+
+    def _send(self, status, body, headers=None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+@pytest.fixture
+def server():
+    """A local HTTP server for the duration of one test."""
+    _Handler.hits = {}
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+def test_retries_transient_errors(server):
+    """Test that a 503 is retried and counted before the successful answer is returned."""
+    before = telemetry.snapshot().get("http.retries", 0)
+    response = http_client.get(f"{server}/flaky")
+    assert response.status_code == 200
+    assert _Handler.hits["/flaky"] == 2
+    assert telemetry.snapshot()["http.retries"] - before == 1
+
+def test_retry_after_capped(server, monkeypatch):
+    """Test that a huge Retry-After is cut down to MAX_RETRY_AFTER instead of stalling the caller."""
+    monkeypatch.setattr(http_client, "MAX_RETRY_AFTER", 0.2)
+    start = time.perf_counter()
+    response = http_client.get(f"{server}/slow-down")
+    assert response.status_code == 200
+    assert time.perf_counter() - start < 5
+
+def test_etag_revalidation(server):
+    """Test that a 304 answer replays the earlier response body."""
+    first = http_client.get(f"{server}/etag")
+    second = http_client.get(f"{server}/etag")
+    assert second.status_code == 200
+    assert second.content == first.content == b"hello"
+    assert _Handler.hits["/etag"] == 2
+
+def test_shared_session():
+    """Test that every caller gets the same pooled session."""
+    assert http_client.get_session() is http_client.get_session()
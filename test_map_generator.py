@@ -18,15 +18,31 @@ def test_mapview_type():
 
 def test_save_map_html(tmp_path):
     """
-    Test that the save_map_as method successfully saves a copy of map.html
+    Test that the save_map_as method writes the generated map straight
     to the provided output path.
     """
+    from country_data import Country
     mv = MapView("Dummy", 0, 0)
-    with open("map.html", "w") as f:
-        f.write("<html>Map</html>")
+    mv.generate_map(Country("Dummy", "Capital", "Region", 1, 1, "Euro (EUR) €", "UTC", "", "A fact."))
     save_path = tmp_path / "output_map.html"
     mv.save_map_as(str(save_path))
     assert save_path.exists()
+    assert "Dummy" in save_path.read_text(encoding="utf-8")
+
+def test_map_views_do_not_share_a_file(monkeypatch):
+    """Test that each MapView previews from its own temp file instead of a shared map.html."""
+    import map_generator
+    from country_data import Country
+    opened = []
+    monkeypatch.setattr(map_generator.webbrowser, "open", lambda url, new=0: opened.append(url))
+    views = []
+    for name in ("Chile", "Kenya"):
+        mv = MapView(name, 1.0, 2.0, "Default")
+        mv.generate_map(Country(name, "Capital", "Region", 1, 1, "Euro (EUR) €", "UTC", "", "A fact."))
+        mv.open_in_browser()
+        views.append(mv)
+    assert len(set(opened)) == 2
+    assert all(url.startswith("file://") for url in opened)
 
 def test_generate_map_creates_file():
     """
@@ -48,3 +64,30 @@ def test_generate_map_creates_file():
     create_map("Italy", 41.9, 12.5, country_info, "Hybrid")
     assert os.path.exists("map.html")
 
+
+def test_create_map_cache_hits():
+    """
+    Test that repeat views are served from the rendered-map cache and that
+    switching tile style or changing the data renders a new map.
+    """
+    from map_generator import create_map, clear_map_cache, map_cache_info
+    country_info = {
+        "Name": "Peru",
+        "Capital": "Lima",
+        "Region": "Americas",
+        "Population": 33000000,
+        "Area": 1285216,
+        "Currency": "Peruvian sol (PEN) S/ ",
+        "Timezone": "UTC-05:00",
+        "Flag": "https://flagcdn.com/pe.png",
+        "Fun Fact": "Peru is home to Machu Picchu."
+    }
+    clear_map_cache()
+    create_map("Peru", -10.0, -76.0, country_info, "Hybrid")
+    create_map("Peru", -10.0, -76.0, country_info, "Satellite")
+    create_map("Peru", -10.0, -76.0, country_info, "Hybrid")
+    create_map("Peru", -10.0, -76.0, dict(country_info, Capital="Cusco"), "Hybrid")
+    info = map_cache_info()
+    assert info["hits"] == 1
+    assert info["misses"] == 3
+    assert info["size"] == 3
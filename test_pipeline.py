@@ -0,0 +1,169 @@
+import threading
+import time
+import pipeline
+from pipeline import ExplorePipeline
+
+
+class _FakeCountry:
+    """Stand-in for country_data.Country with just the fields the pipeline reads."""
+
+    def __init__(self, name):
+        self.name = name
+        self.currency = "Japanese yen (JPY) ¥"
+        self.flag_url = f"https://flagcdn.com/{name}.png"
+        self.fun_fact = None
+
+
+class _FakeMapView:
+    """Stand-in for MapView that records the coordinates it was built with."""
+
+    def __init__(self, country_name, latitude, longitude, map_type="Hybrid"):
+        self.coordinates = (latitude, longitude)
+
+    def generate_map(self, country):
+        self.fun_fact = country.fun_fact
+
+
+def _stub_fetches(monkeypatch, fetch_country=None):
+    """Replace every network step the pipeline calls with instant fakes."""
+    monkeypatch.setattr(pipeline.Country, "fetch_country", fetch_country or (lambda name, with_fun_fact=True: _FakeCountry(name)))
+    monkeypatch.setattr(pipeline, "get_fun_fact", lambda name: f"Fact about {name}")
+    monkeypatch.setattr(pipeline, "get_coordinates", lambda country: (36.2, 138.2))
+    monkeypatch.setattr(pipeline, "get_currency_conversion", lambda base: {"USD": 0.0067})
+    monkeypatch.setattr(pipeline, "get_flag_thumbnail", lambda url, size: "flag-image")
+    monkeypatch.setattr(pipeline, "MapView", _FakeMapView)
+
+
+def test_pipeline_delivers_every_panel(monkeypatch):
+    """Test that country, flag, currency and map results are all posted back for one Explore."""
+    _stub_fetches(monkeypatch)
+    results = {}
+    done = threading.Event()
+    explore = ExplorePipeline(lambda fn: fn())
+    explore.start(
+        "Japan",
+        on_country=lambda country: results.setdefault("country", country.name),
+        on_flag=lambda country, image: results.setdefault("flag", image),
+        on_currency=lambda base, conversions: results.setdefault("currency", base),
+        on_map=lambda map_view: (results.setdefault("map", map_view), done.set()),
+    )
+    assert done.wait(5)
+    explore.executor.shutdown(wait=True)
+    assert results["country"] == "Japan"
+    assert results["flag"] == "flag-image"
+    assert results["currency"] == "JPY"
+    assert results["map"].coordinates == (36.2, 138.2)
+    assert results["map"].fun_fact == "Fact about Japan"
+
+
+def test_pipeline_drops_stale_results(monkeypatch):
+    """Test that a newer Explore supersedes one still in flight."""
+    release = threading.Event()
+
+    def slow_fetch(name, with_fun_fact=True):
+        if name == "Slowland":
+            release.wait(5)
+        return _FakeCountry(name)
+
+    _stub_fetches(monkeypatch, slow_fetch)
+    seen = []
+    done = threading.Event()
+    explore = ExplorePipeline(lambda fn: fn())
+    explore.start("Slowland", on_country=lambda country: seen.append(country.name))
+    explore.start("Japan", on_country=lambda country: seen.append(country.name), on_map=lambda map_view: done.set())
+    assert done.wait(5)
+    release.set()
+    explore.executor.shutdown(wait=True)
+    assert seen == ["Japan"]
+
+
+def test_duplicate_explores_share_one_fetch(monkeypatch):
+    """Test that starting the same country twice while it loads reuses the running Explore and its fetch."""
+    release = threading.Event()
+    calls = []
+
+    def slow_fetch(name, with_fun_fact=True):
+        calls.append(name)
+        release.wait(5)
+        return _FakeCountry(name)
+
+    _stub_fetches(monkeypatch, slow_fetch)
+    done = threading.Event()
+    explore = ExplorePipeline(lambda fn: fn())
+    first = explore.start("Japan", on_map=lambda map_view: done.set())
+    assert explore.start(" japan ", on_map=lambda map_view: done.set()) is first
+    release.set()
+    assert done.wait(5)
+    explore.executor.shutdown(wait=True)
+    assert calls == ["Japan"]
+    assert explore.start("Japan") is not first
+
+
+def test_map_failure_reported(monkeypatch):
+    """Test that an error while building the map is posted and leaves the pipeline idle."""
+
+    class _BrokenMapView(_FakeMapView):
+        def generate_map(self, country):
+            raise OSError("disk full")
+
+    _stub_fetches(monkeypatch)
+    monkeypatch.setattr(pipeline, "MapView", _BrokenMapView)
+    errors = []
+    done = threading.Event()
+    explore = ExplorePipeline(lambda fn: fn())
+    explore.start("Japan", on_error=lambda title, message: (errors.append(message), done.set()))
+    assert done.wait(5)
+    explore.executor.shutdown(wait=True)
+    assert "disk full" in errors[0]
+    assert explore.idle()
+
+
+def test_explore_joins_prefetched_fun_fact(monkeypatch):
+    """Test that an Explore waits on a summary already being fetched (e.g. by the prefetcher) instead of refetching."""
+    from telemetry import snapshot
+    _stub_fetches(monkeypatch)
+    started, release = threading.Event(), threading.Event()
+
+    def prefetched_fact(name):
+        started.set()
+        release.wait(5)
+        return "Prefetched fact"
+
+    prefetch = threading.Thread(target=pipeline.flights.do, args=(("fun_fact", "Japan"), prefetched_fact, "Japan"))
+    prefetch.start()
+    assert started.wait(5)
+    calls = []
+    monkeypatch.setattr(pipeline, "get_fun_fact", lambda name: calls.append(name) or "Fresh fact")
+    shared = snapshot().get("singleflight.shared", 0)
+    results = {}
+    done = threading.Event()
+    explore = ExplorePipeline(lambda fn: fn())
+    explore.start("Japan", on_map=lambda map_view: (results.setdefault("map", map_view), done.set()))
+    deadline = time.monotonic() + 5
+    while snapshot().get("singleflight.shared", 0) == shared and time.monotonic() < deadline:
+        time.sleep(0.005)
+    release.set()
+    assert done.wait(5)
+    prefetch.join(5)
+    explore.executor.shutdown(wait=True)
+    assert results["map"].fun_fact == "Prefetched fact"
+    assert calls == []
+
+
+def test_flag_and_currency_failures_reported(monkeypatch):
+    """Test that a failing flag or rate fetch posts an error and counts it, while the map still arrives."""
+    from telemetry import snapshot
+    _stub_fetches(monkeypatch)
+    monkeypatch.setattr(pipeline, "get_flag_thumbnail", lambda url, size: 1 / 0)
+    monkeypatch.setattr(pipeline, "get_currency_conversion", lambda base: 1 / 0)
+    before = snapshot()
+    errors = []
+    done = threading.Event()
+    explore = ExplorePipeline(lambda fn: fn())
+    explore.start("Japan", on_error=lambda title, message: errors.append(title), on_map=lambda map_view: done.set())
+    assert done.wait(5)
+    explore.executor.shutdown(wait=True)
+    assert sorted(errors) == ["Currency Error", "Flag Error"]
+    counters = snapshot()
+    assert counters["explore.flag_failed"] - before.get("explore.flag_failed", 0) == 1
+    assert counters["explore.currency_failed"] - before.get("explore.currency_failed", 0) == 1
@@ -0,0 +1,66 @@
+import threading
+import time
+import prefetch
+from country_data import Country
+from prefetch import Prefetcher
+
+class _FakePipeline:
+    """Stand-in for ExplorePipeline whose idle state the test controls."""
+
+    def __init__(self, busy=False):
+        self.busy = busy
+
+    def idle(self):
+        return not self.busy
+
+def _country(name, borders=()):
+    return Country(name, "Capital", "Region", 1, 1, "Peso (CLP) $", "UTC", f"https://flagcdn.com/{name}.png", None,
+                   borders=borders)
+
+def _stub_fetches(monkeypatch):
+    """Record every warmed lookup instead of calling the network."""
+    calls = []
+    lock = threading.Lock()
+
+    def record(kind, value, result=True):
+        with lock:
+            calls.append((kind, value))
+        return result
+
+    monkeypatch.setattr(prefetch.Country, "fetch_country", lambda name, with_fun_fact=True: record("country", name, _country(name)))
+    monkeypatch.setattr(prefetch, "get_flag_thumbnail", lambda url, size: record("flag", url))
+    monkeypatch.setattr(prefetch, "get_fun_fact", lambda name: record("fun_fact", name))
+    monkeypatch.setattr(prefetch, "get_currency_conversion", lambda base: record("currency", base))
+    return calls
+
+def _wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.005)
+    return condition()
+
+def test_candidates_are_neighbours_then_recent():
+    """Test that borders come before recent searches, skipping the explored country, within the budget."""
+    prefetcher = Prefetcher(_FakePipeline(), budget=3)
+    try:
+        chile = _country("Chile", borders=["ARG", "BOL", "PER"])
+        assert prefetcher.candidates(chile, ["Chile", "Japan"]) == ["ARG", "BOL", "PER"]
+        assert prefetcher.candidates(_country("Peru", borders=["CHL"]), ["Peru", "Japan"]) == ["CHL", "Japan"]
+    finally:
+        prefetcher.stop()
+
+def test_prefetch_waits_for_user_explores(monkeypatch):
+    """Test that nothing is warmed while an Explore runs, and every panel's data is warmed once it is idle."""
+    calls = _stub_fetches(monkeypatch)
+    pipeline = _FakePipeline(busy=True)
+    prefetcher = Prefetcher(pipeline)
+    try:
+        prefetcher.schedule(_country("Chile", borders=["ARG"]))
+        time.sleep(0.15)
+        assert calls == []
+        pipeline.busy = False
+        assert _wait_for(lambda: ("currency", "CLP") in calls)
+        assert [kind for kind, _ in calls] == ["country", "flag", "fun_fact", "currency"]
+        assert prefetcher.pending() == []
+    finally:
+        prefetcher.stop()
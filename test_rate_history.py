@@ -0,0 +1,39 @@
+import numpy as np
+from rate_history import RateHistory, format_matrix
+
+def _history(tmp_path):
+    history = RateHistory(str(tmp_path / "rates.sqlite3"))
+    history.record({"USD": 1.0, "EUR": 0.9, "GBP": 0.8}, fetched_at=1000)
+    history.record({"USD": 1.0, "EUR": 0.8, "GBP": 0.75, "JPY": 150.0}, fetched_at=2000)
+    return history
+
+def test_matrix_from_one_snapshot(tmp_path):
+    """Test that every cell of the conversion matrix comes from the table in force at as_of."""
+    history = _history(tmp_path)
+    matrix = history.matrix(["USD", "EUR", "JPY"], as_of=1500)
+    assert matrix[0, 1] == 0.9 and np.isnan(matrix[0, 2])
+    latest = history.matrix(["EUR", "JPY"])
+    assert np.isclose(latest[0, 1], 150.0 / 0.8)
+    assert np.allclose(latest * latest.T, 1.0) and np.allclose(np.diag(latest), 1.0)
+    assert history.matrix(["USD"], as_of=10) is None
+    assert "JPY" in format_matrix(["EUR", "JPY"], latest)
+
+def test_series_and_duplicate_snapshots(tmp_path):
+    """Test that the stored series is ordered in time and a re-recorded table is not duplicated."""
+    history = _history(tmp_path)
+    history.record({"USD": 1.0, "EUR": 0.5}, fetched_at=2000)
+    times, values = history.series("EUR", "GBP")
+    assert times.tolist() == [1000, 2000]
+    assert np.allclose(values, [0.8 / 0.9, 0.75 / 0.8])
+    assert len(history) == 2
+    assert history.snapshot("1970-01-01T00:25:00+00:00")[1]["EUR"] == 0.9
+
+def test_date_only_as_of_includes_that_day(tmp_path):
+    """Test that a plain date covers tables fetched during that day, and starts a series at its midnight."""
+    from datetime import datetime
+    history = RateHistory(str(tmp_path / "rates.sqlite3"))
+    history.record({"USD": 1.0, "EUR": 0.9}, fetched_at=datetime(2026, 1, 30, 9, 0))
+    history.record({"USD": 1.0, "EUR": 0.8}, fetched_at=datetime(2026, 1, 31, 15, 30))
+    assert history.snapshot("2026-01-31")[1]["EUR"] == 0.8
+    assert history.snapshot("2026-01-30")[1]["EUR"] == 0.9
+    assert history.series("USD", "EUR", start="2026-01-31")[1].tolist() == [0.8]
@@ -0,0 +1,42 @@
+from row_pool import RowPool
+
+class _FakeRow:
+    """Stand-in for a Tk frame that records what it shows and whether it is packed."""
+
+    def __init__(self):
+        self.text = None
+        self.packed = False
+        self.fills = 0
+
+    def pack(self, **options):
+        self.packed = True
+
+    def pack_forget(self):
+        self.packed = False
+
+def _fill(row, item):
+    row.text = item
+    row.fills += 1
+
+def _visible(pool):
+    return [row.text for row in pool.rows if row.packed]
+
+def test_rows_reused_across_updates():
+    """Test that a shorter list hides rows and a longer one re-shows them without building new widgets."""
+    pool = RowPool(_FakeRow, _fill)
+    pool.update(["Japan", "Chile", "Peru"])
+    rows = list(pool.rows)
+    pool.update(["Kenya"])
+    assert _visible(pool) == ["Kenya"]
+    pool.update(["Kenya", "Japan", "Chile"])
+    assert pool.rows == rows
+    assert _visible(pool) == ["Kenya", "Japan", "Chile"]
+
+def test_unchanged_rows_not_refilled():
+    """Test that only rows whose item changed are filled again, unless refresh asks for it."""
+    pool = RowPool(_FakeRow, _fill)
+    pool.update(["Japan", "Chile"])
+    pool.update(["Japan", "Peru"])
+    assert [row.fills for row in pool.rows] == [1, 2]
+    pool.refresh("Japan")
+    assert [row.fills for row in pool.rows] == [2, 2]
@@ -0,0 +1,41 @@
+import threading
+import time
+import pytest
+import telemetry
+from single_flight import SingleFlight
+
+def test_concurrent_calls_share_one_result():
+    """Test that callers arriving while a call for the same key runs get its result without calling again."""
+    flights = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+    calls, results = [], []
+
+    def fetch():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return "Japan"
+
+    leader = threading.Thread(target=lambda: results.append(flights.do("jp", fetch)))
+    leader.start()
+    assert started.wait(5)
+    followers = [threading.Thread(target=lambda: results.append(flights.do("jp", fetch))) for _ in range(3)]
+    shared = telemetry.snapshot().get("singleflight.shared", 0)
+    for thread in followers:
+        thread.start()
+    deadline = time.monotonic() + 5
+    while telemetry.snapshot().get("singleflight.shared", 0) < shared + 3 and time.monotonic() < deadline:
+        time.sleep(0.001)
+    release.set()
+    for thread in [leader] + followers:
+        thread.join(5)
+    assert results == ["Japan"] * 4
+    assert calls == [1]
+    assert flights.in_flight() == 0
+
+def test_errors_shared_and_not_cached():
+    """Test that a failed call raises for its caller and the next call runs again."""
+    flights = SingleFlight()
+    with pytest.raises(ValueError):
+        flights.do("x", lambda: (_ for _ in ()).throw(ValueError("boom")))
+    assert flights.do("x", lambda: 42) == 42
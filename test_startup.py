@@ -0,0 +1,73 @@
+import ast
+import json
+import os
+import subprocess
+import sys
+from PIL import Image
+import startup
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+
+# The GUI toolkit is needed to draw the window at all, so it is left out of the probe.
+_GUI_MODULES = ("tkinter", "customtkinter")
+
+_IMPORT_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+for spec in sys.argv[1:]:
+    module, _, names = spec.partition(":")
+    __import__(module, fromlist=names.split(",") if names else [])
+elapsed = time.perf_counter() - start
+import startup
+print(json.dumps({"seconds": elapsed, "loaded": [m for m in startup.HEAVY_MODULES if m in sys.modules]}))
+"""
+
+def _main_imports():
+    """Every top-level import of main.py as "module" or "module:name,...", apart from the GUI toolkit."""
+    with open(os.path.join(_HERE, "main.py"), encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    modules = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            modules.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            modules.append(f"{node.module}:{','.join(alias.name for alias in node.names)}")
+    return [spec for spec in modules if spec.partition(":")[0].split(".")[0] not in _GUI_MODULES]
+
+def _probe_imports():
+    """Import main.py's modules in a fresh interpreter and report the time taken and heavy modules loaded."""
+    output = subprocess.run([sys.executable, "-c", _IMPORT_PROBE, *_main_imports()], capture_output=True, text=True,
+                            check=True, cwd=_HERE).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def test_probe_covers_main_imports():
+    """Test that the probe imports the modules main.py loads before its window appears."""
+    modules = {spec.partition(":")[0] for spec in _main_imports()}
+    assert {"country_data", "pipeline", "prefetch", "startup", "map_generator"} <= modules
+    assert not modules & {"tkinter", "customtkinter"}
+
+def test_startup_imports_skip_heavy_modules():
+    """Test that folium, pycountry, requests and PIL are not imported before the window appears."""
+    assert _probe_imports()["loaded"] == []
+
+def test_startup_imports_within_budget():
+    """Test that the cold import of the startup modules stays under the startup budget (best of three)."""
+    assert min(_probe_imports()["seconds"] for _ in range(3)) < startup.IMPORT_BUDGET
+
+def test_background_scaled_once_and_cached(monkeypatch, tmp_path):
+    """Test that the background is cover-scaled to the screen and served from the cached copy afterwards."""
+    monkeypatch.setattr(startup, "CACHE_DIR", str(tmp_path))
+    source = tmp_path / "earth.png"
+    Image.new("RGB", (400, 200), "blue").save(source)
+
+    image = startup.load_background(str(source), (120, 90))
+    assert image.size == (120, 90)
+    assert os.path.exists(startup.background_cache_path((120, 90)))
+
+    monkeypatch.setattr(Image, "open", lambda path, *args: _fail_if_source(path, source))
+    startup.load_background(str(source), (120, 90))
+
+def _fail_if_source(path, source):
+    """Stand-in for Image.open that refuses to decode the full-resolution source."""
+    assert path != str(source)
+    return "cached"
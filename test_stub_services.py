@@ -0,0 +1,37 @@
+import pytest
+import country_data
+from cache import TTLCache
+from rate_history import RateHistory
+from stub_services import StubServices
+
+@pytest.fixture
+def stubs(monkeypatch, tmp_path):
+    """Run the stub services and point country_data (with fresh caches) at them."""
+    for name in ("REST_COUNTRIES_URL", "EXCHANGE_RATE_URL", "WIKIPEDIA_API_URL", "NOMINATIM_DOMAIN", "NOMINATIM_SCHEME"):
+        monkeypatch.setattr(country_data, name, getattr(country_data, name))
+    db_path = str(tmp_path / "cache.sqlite3")
+    for name in ("_rest_cache", "_country_info_cache", "_summary_cache", "_rates_cache", "_geocode_cache"):
+        cache = getattr(country_data, name)
+        monkeypatch.setattr(country_data, name, TTLCache(cache.namespace, 60, db_path=db_path))
+    monkeypatch.setattr(country_data, "_rate_history", RateHistory(db_path))
+    with StubServices() as services:
+        services.configure_app()
+        yield services
+
+def test_fetch_country_against_stubs(stubs):
+    """Test the full lookup path (REST Countries and Wikipedia) offline."""
+    country = country_data.Country.fetch_country("Japan")
+    assert country.name == "Japan"
+    assert country.fun_fact.startswith("Japan is a country")
+    assert stubs.requests["restcountries"] == 1
+    assert stubs.requests["wikipedia"] == 1
+
+def test_geocode_and_currency_against_stubs(stubs):
+    """Test Nominatim geocoding and the batched rate table offline."""
+    assert country_data.geocode_country("France") == pytest.approx((46.227638, 2.213749))
+    assert set(country_data.get_currency_conversion("EUR")) == {"USD", "GBP", "JPY", "EUR"}
+
+def test_failure_injection(stubs):
+    """Test that an injected REST Countries failure surfaces as a not-found lookup."""
+    stubs.failure_rate["restcountries"] = 1.0
+    assert country_data.Country.fetch_country("Peru") is None
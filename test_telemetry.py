@@ -0,0 +1,48 @@
+import json
+import logging
+import pytest
+import telemetry
+
+def test_span_emits_timing_and_failure():
+    """Test that spans report their stage, duration, extra fields and whether the block raised."""
+    events = []
+    telemetry.add_listener(events.append)
+    try:
+        with telemetry.span("rest_fetch", country="Japan") as fields:
+            fields["status"] = 200
+        with pytest.raises(ValueError):
+            with telemetry.span("wikipedia"):
+                raise ValueError
+    finally:
+        telemetry.remove_listener(events.append)
+    assert events[0]["stage"] == "rest_fetch"
+    assert events[0]["status"] == 200
+    assert events[0]["ok"] is True
+    assert events[1]["ok"] is False
+
+def test_json_lines_log(tmp_path):
+    """Test that spans and counters are written one JSON object per line."""
+    path = tmp_path / "timing.jsonl"
+    handler = telemetry.enable_json_log(str(path))
+    try:
+        telemetry.record("map_render", 0.25, country="Peru")
+        telemetry.incr("cache.map.hit")
+    finally:
+        telemetry.logger.removeHandler(handler)
+        telemetry.logger.setLevel(logging.NOTSET)
+        handler.close()
+    lines = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    assert lines[0]["stage"] == "map_render" and lines[0]["ms"] == 250.0
+    assert lines[1]["event"] == "counter" and lines[1]["name"] == "cache.map.hit"
+
+def test_cache_hits_and_misses_counted(tmp_path):
+    """Test that TTLCache lookups feed the shared hit/miss counters."""
+    from cache import TTLCache
+    cache = TTLCache("telemetry_test", 60, db_path=str(tmp_path / "c.sqlite3"))
+    before = telemetry.snapshot()
+    cache.get("japan")
+    cache.set("japan", 1)
+    cache.get("japan")
+    after = telemetry.snapshot()
+    assert after["cache.telemetry_test.miss"] - before.get("cache.telemetry_test.miss", 0) == 1
+    assert after["cache.telemetry_test.hit"] - before.get("cache.telemetry_test.hit", 0) == 1
@@ -0,0 +1,78 @@
+import os
+import urllib.request
+import pytest
+import map_generator
+import tile_proxy
+from tile_proxy import TileCache, TileProxy, prewarm_radius, tile_xy, tiles_around
+
+class _FakeResponse:
+    def __init__(self, content, status_code=200):
+        self.content = content
+        self.status_code = status_code
+
+def _fake_upstream(monkeypatch, size=100):
+    """Serve size-byte PNG-like tiles instead of calling the tile servers, recording each URL."""
+    calls = []
+    monkeypatch.setattr(tile_proxy.http_client, "get",
+                        lambda url, **kwargs: calls.append(url) or _FakeResponse(b"\x89PNG" + b"x" * (size - 4)))
+    return calls
+
+def test_tile_math():
+    """Test that tile coordinates and the prewarm box follow the slippy-map scheme."""
+    assert tile_xy(0, 0, 0) == (0, 0)
+    assert tile_xy(0.1, 0.1, 1) == (1, 0)
+    assert tiles_around(35.0, 139.0, zooms=range(0, 3)).count((0, 0, 0)) == 1
+
+def test_prewarm_box_follows_country_size():
+    """Test that the prewarmed area grows with the country, within bounds, and falls back for an unknown area."""
+    assert prewarm_radius(2.02) == tile_proxy.MIN_PREWARM_RADIUS
+    assert prewarm_radius(17_098_242) > prewarm_radius(377_930) > prewarm_radius(41_285)
+    assert prewarm_radius("N/A") == tile_proxy.PREWARM_RADIUS
+    monaco = tiles_around(43.7, 7.4, zooms=[6], radius=prewarm_radius(2.02))
+    russia = tiles_around(61.5, 105.3, zooms=[6], radius=prewarm_radius(17_098_242))
+    assert len(monaco) <= 4 < 100 < len(russia)
+
+def test_tiles_downloaded_once_and_bounded(monkeypatch, tmp_path):
+    """Test that a tile is fetched once, then served from disk, and old tiles go once the cache is full."""
+    calls = _fake_upstream(monkeypatch)
+    cache = TileCache(str(tmp_path), max_bytes=250)
+    assert cache.get("osm", 1, 0, 0) == cache.get("osm", 1, 0, 0)
+    assert calls == ["https://tile.openstreetmap.org/1/0/0.png"]
+    for y in range(1, 4):
+        cache.get("osm", 2, 0, y)
+    tiles = [name for _, _, names in os.walk(tmp_path) for name in names]
+    assert len(tiles) == 2
+    assert cache.get("osm", 5, 0, 0, fetch=False) is None
+
+def test_proxy_serves_cached_tiles_offline(monkeypatch, tmp_path):
+    """Test that the proxy answers from the cache and stops fetching once offline."""
+    import country_data
+    calls = _fake_upstream(monkeypatch)
+    proxy = TileProxy(TileCache(str(tmp_path))).start()
+    try:
+        url = proxy.url_template("hybrid").format(z=3, x=4, y=2)
+        assert urllib.request.urlopen(url).read().startswith(b"\x89PNG")
+        monkeypatch.setattr(country_data, "OFFLINE", True)
+        assert urllib.request.urlopen(url).read().startswith(b"\x89PNG")
+        with pytest.raises(urllib.error.HTTPError):
+            urllib.request.urlopen(proxy.url_template("hybrid").format(z=3, x=5, y=2))
+        assert len(calls) == 1
+    finally:
+        proxy.stop()
+
+def test_maps_use_proxy_but_save_upstream_urls(monkeypatch, tmp_path):
+    """Test that rendered maps load tiles via the proxy while saved maps point at the tile servers."""
+    from country_data import Country
+    proxy = TileProxy(TileCache(str(tmp_path / "tiles")))
+    map_generator.use_tile_proxy(proxy)
+    try:
+        view = map_generator.MapView("Chile", -30.0, -71.0, "Satellite")
+        view.generate_map(Country("Chile", "Santiago", "Americas", 1, 1, "Peso (CLP) $", "UTC-04:00", "", "A fact."))
+        assert proxy.url_template("satellite") in view._get_html()
+        view.save_map_as(str(tmp_path / "saved.html"))
+        saved = (tmp_path / "saved.html").read_text(encoding="utf-8")
+        assert proxy.base_url not in saved
+        assert "lyrs=s" in saved
+    finally:
+        map_generator.use_tile_proxy(None)
+        proxy.stop()
@@ -0,0 +1,60 @@
+import time
+from country_store import CountryStore
+from typeahead import CountryIndex
+
+def _index():
+    """An index over pycountry plus one REST record carrying altSpellings."""
+    store = CountryStore([{"cca3": "DEU", "cca2": "DE", "name": {"common": "Germany", "official": "Federal Republic of Germany"},
+                           "altSpellings": ["DE", "Deutschland"]}])
+    return CountryIndex.build(store)
+
+def test_prefix_and_code_suggestions():
+    """Test that prefixes, later words and exact alpha codes all suggest the right country."""
+    index = _index()
+    assert index.suggest("jap")[0] == "Japan"
+    assert "United Kingdom" in index.suggest("kingdom")
+    assert index.suggest("JPN")[0] == "Japan"
+    assert index.suggest("") == []
+
+def test_typos_accents_and_alt_spellings():
+    """Test that one-typo input, unaccented input and REST altSpellings resolve to the canonical name."""
+    index = _index()
+    assert index.suggest("grmany") == ["Germany"]
+    assert "Côte d'Ivoire" in index.suggest("cote")
+    assert index.resolve("deutschland") == "Germany"
+    assert index.resolve("Xyzland") is None
+
+def test_unindexed_name_still_looked_up(monkeypatch, tmp_path):
+    """Test that a name REST Countries knows but the index does not (pycountry says "Russian Federation") is explored as typed."""
+    import country_data
+    from cache import TTLCache
+    from country_data import Country
+    index = _index()
+    assert index.resolve("Russia") is None
+    assert index.lookup_name(" Russia ") == "Russia"
+    assert index.lookup_name("jpn") == "Japan"
+
+    class _Response:
+        status_code = 200
+
+        def json(self):
+            return [{"name": {"common": "Russia", "official": "Russian Federation"}, "capital": ["Moscow"],
+                     "region": "Europe", "population": 144104080, "area": 17098242.0, "currencies": {},
+                     "timezones": ["UTC+03:00"], "flags": {"png": ""}, "cca2": "RU", "latlng": [60.0, 100.0]}]
+
+    db_path = str(tmp_path / "cache.sqlite3")
+    monkeypatch.setattr(country_data, "_rest_cache", TTLCache("restcountries", 60, db_path=db_path))
+    monkeypatch.setattr(country_data, "_country_info_cache", TTLCache("country_info", 60, db_path=db_path))
+    monkeypatch.setattr(country_data, "get_fun_fact", lambda name: "A fun fact.")
+    monkeypatch.setattr(country_data.http_client, "get", lambda url, **kwargs: _Response())
+    assert Country.fetch_country(index.lookup_name("Russia")).capital == "Moscow"
+
+def test_suggestions_under_a_millisecond():
+    """Test that a keystroke's suggestions take well under a millisecond on average."""
+    index = _index()
+    queries = ["s", "sw", "swi", "swit", "swtz", "united", "kingdom", "cote"]
+    start = time.perf_counter()
+    for _ in range(100):
+        for query in queries:
+            index.suggest(query)
+    assert (time.perf_counter() - start) / (100 * len(queries)) < 0.001
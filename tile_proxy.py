@@ -0,0 +1,216 @@
+"""Local caching proxy for the map tile layers.
+
+Maps opened from the GUI point their tile layers at this proxy instead of Google/OSM, so each tile is
+downloaded once, kept in a size-bounded folder under the cache dir, and still served when offline.
+"""
+import math
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import http_client
+from cache import CACHE_DIR
+from telemetry import incr
+
+TILE_DIR = os.path.join(CACHE_DIR, "tiles")
+MAX_TILE_BYTES = int(os.getenv("GLOBEIO_TILE_CACHE_MB", "200")) * 1024 * 1024
+
+# Upstream URL templates, keyed by the layer name used in proxy URLs.
+UPSTREAM_TILES = {
+    "osm": "https://tile.openstreetmap.org/{z}/{x}/{y}.png",
+    "roadmap": "http://mt1.google.com/vt/lyrs=m&x={x}&y={y}&z={z}",
+    "satellite": "http://mt1.google.com/vt/lyrs=s&x={x}&y={y}&z={z}",
+    "hybrid": "http://mt1.google.com/vt/lyrs=y&x={x}&y={y}&z={z}",
+}
+
+# Zoom levels fetched ahead of time around a country (the map opens at zoom 6), and how far around it
+# when its area is unknown. Radii from an area are kept between MIN and MAX_PREWARM_RADIUS degrees.
+PREWARM_ZOOMS = range(0, 7)
+PREWARM_RADIUS = 8.0
+MIN_PREWARM_RADIUS = 1.0
+MAX_PREWARM_RADIUS = 30.0
+KM_PER_DEGREE = 111.32
+# Tiles prewarmed per layer at most; the lowest zooms come first, so a huge country loses its closest zooms.
+MAX_PREWARM_TILES = 400
+
+_TILE_PATH = re.compile(r"^/(\w+)/(\d+)/(\d+)/(\d+)\.png$")
+
+
+def tile_xy(latitude, longitude, zoom):
+    """The slippy-map tile column and row containing a point at a zoom level."""
+    latitude = max(-85.0511, min(85.0511, latitude))
+    n = 2 ** zoom
+    x = int((longitude + 180.0) / 360.0 * n)
+    y = int((1.0 - math.asinh(math.tan(math.radians(latitude))) / math.pi) / 2.0 * n)
+    return min(max(x, 0), n - 1), min(max(y, 0), n - 1)
+
+
+def prewarm_radius(area):
+    """Half-width in degrees of the box around a country of area km², treating it as a square plus a margin."""
+    try:
+        side = math.sqrt(float(area)) / KM_PER_DEGREE
+    except (TypeError, ValueError):
+        return PREWARM_RADIUS
+    return min(max(side * 0.75, MIN_PREWARM_RADIUS), MAX_PREWARM_RADIUS)
+
+
+def tiles_around(latitude, longitude, zooms=PREWARM_ZOOMS, radius=PREWARM_RADIUS):
+    """Every (z, x, y) tile covering the box radius degrees around a point, for each zoom in zooms.
+
+    The box is widened east-west away from the equator, where a degree of longitude is shorter.
+    """
+    lon_radius = min(radius / max(math.cos(math.radians(latitude)), 0.2), 180.0)
+    tiles = []
+    for z in zooms:
+        left, top = tile_xy(latitude + radius, longitude - lon_radius, z)
+        right, bottom = tile_xy(latitude - radius, longitude + lon_radius, z)
+        tiles.extend((z, x, y) for x in range(left, right + 1) for y in range(top, bottom + 1))
+    return tiles
+
+
+def _content_type(data):
+    return "image/jpeg" if data[:2] == b"\xff\xd8" else "image/png"
+
+
+class TileCache:
+    """Tiles on disk under folder, evicting the least recently used once they pass max_bytes in total."""
+
+    def __init__(self, folder=TILE_DIR, max_bytes=MAX_TILE_BYTES):
+        self.folder = folder
+        self.max_bytes = max_bytes
+        self._sizes = None
+        self._total = 0
+        self._lock = threading.Lock()
+
+    def _path(self, layer, z, x, y):
+        return os.path.join(self.folder, layer, str(z), str(x), f"{y}.tile")
+
+    def _scan(self):
+        """Sizes of the tiles already on disk, read once per process."""
+        if self._sizes is None:
+            self._sizes = {}
+            for dirpath, _, filenames in os.walk(self.folder):
+                for filename in filenames:
+                    if filename.endswith(".tile"):
+                        path = os.path.join(dirpath, filename)
+                        self._sizes[path] = os.path.getsize(path)
+            self._total = sum(self._sizes.values())
+        return self._sizes
+
+    def get(self, layer, z, x, y, fetch=True):
+        """Tile bytes from disk, downloading them first when missing and fetch is set; None if unavailable."""
+        path = self._path(layer, z, x, y)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)
+            incr("cache.tile.hit")
+            return data
+        except OSError:
+            pass
+        incr("cache.tile.miss")
+        if not fetch or layer not in UPSTREAM_TILES:
+            return None
+        try:
+            response = http_client.get(UPSTREAM_TILES[layer].format(z=z, x=x, y=y))
+        except Exception:
+            return None
+        if response.status_code != 200:
+            return None
+        self._store(path, response.content)
+        return response.content
+
+    def _store(self, path, data):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        with self._lock:
+            sizes = self._scan()
+            self._total += len(data) - sizes.get(path, 0)
+            sizes[path] = len(data)
+            if self._total <= self.max_bytes:
+                return
+            # Evict down to 90% of the limit so the next few downloads do not each trigger a scan.
+            target = self.max_bytes * 0.9
+            for old_path in sorted(sizes, key=lambda p: os.path.getmtime(p) if os.path.exists(p) else 0):
+                if self._total <= target:
+                    break
+                self._total -= sizes.pop(old_path)
+                try:
+                    os.remove(old_path)
+                except OSError:
+                    pass
+
+
+class TileProxy:
+    """A local HTTP server answering /<layer>/<z>/<x>/<y>.png from a TileCache."""
+
+    def __init__(self, cache=None, host="127.0.0.1", port=0, max_workers=4):
+        self.cache = cache or TileCache()
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = None
+        self._prewarm = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tile-prewarm")
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def url_template(self, layer):
+        """Leaflet URL template for one layer, served through this proxy."""
+        return f"{self.base_url}/{layer}/{{z}}/{{x}}/{{y}}.png"
+
+    def to_upstream(self, html):
+        """Point every proxied tile URL in html back at its upstream, e.g. before saving a map for later."""
+        for layer, upstream in UPSTREAM_TILES.items():
+            html = html.replace(self.url_template(layer), upstream)
+        return html
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._prewarm.shutdown(wait=False, cancel_futures=True)
+        if self._thread is not None:
+            self._server.shutdown()
+        self._server.server_close()
+
+    def prewarm(self, latitude, longitude, layers, zooms=PREWARM_ZOOMS, area=None):
+        """Fetch the low-zoom tiles around a point in the background, over a box sized from area (km²); returns the futures."""
+        import country_data
+        if country_data.OFFLINE:
+            return []
+        radius = prewarm_radius(area)
+        return [self._prewarm.submit(self.cache.get, layer, z, x, y)
+                for layer in layers for z, x, y in tiles_around(latitude, longitude, zooms, radius)[:MAX_PREWARM_TILES]]
+
+    def _make_handler(self):
+        proxy = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                import country_data
+                match = _TILE_PATH.match(self.path)
+                if not match:
+                    return self.send_error(404)
+                layer, z, x, y = match.group(1), *map(int, match.groups()[1:])
+                data = proxy.cache.get(layer, z, x, y, fetch=not country_data.OFFLINE)
+                if data is None:
+                    return self.send_error(404)
+                self.send_response(200)
+                self.send_header("Content-Type", _content_type(data))
+                self.send_header("Content-Length", str(len(data)))
+                self.send_header("Cache-Control", "max-age=86400")
+                self.end_headers()
+                self.wfile.write(data)
+
+        return Handler
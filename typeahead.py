@@ -0,0 +1,137 @@
+import os
+import unicodedata
+from bisect import bisect_left
+from country_store import SNAPSHOT_PATH, CountryStore
+
+MAX_SUGGESTIONS = 8
+# Typo tolerance (one edit) only applies from this many characters on, and only within the
+# first FUZZY_PREFIX characters of a name, which keeps the deletion index small.
+MIN_FUZZY_LENGTH = 3
+FUZZY_PREFIX = 12
+# Alpha-2/alpha-3 codes only match when typed in full, so "j" suggests Japan rather than "JE".
+MAX_CODE_LENGTH = 3
+
+
+def fold(text):
+    """Lowercase text and strip accents, so "cote" finds "Côte d'Ivoire"."""
+    decomposed = unicodedata.normalize("NFKD", text.strip().lower())
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def _deletions(text):
+    """Every string obtained by removing one character from text."""
+    return {text[:i] + text[i + 1:] for i in range(len(text))}
+
+
+class CountryIndex:
+    """Prefix and one-typo index over country names, codes and alternate spellings, answering in well under 1ms."""
+
+    def __init__(self, names):
+        # names: (search key, canonical country name) pairs.
+        self._keys = {}
+        self._word_keys = set()
+        for key, country in names:
+            key = fold(key)
+            if key:
+                self._keys.setdefault(key, country)
+                # Let "kingdom" find "United Kingdom" as well as names that start with it.
+                words = key.split()
+                for i in range(1, len(words)):
+                    word_key = " ".join(words[i:])
+                    if word_key not in self._keys:
+                        self._keys[word_key] = country
+                        self._word_keys.add(word_key)
+        self._sorted = sorted(key for key in self._keys if len(key) > MAX_CODE_LENGTH)
+        self._fuzzy = {}
+        for key in self._sorted:
+            country = self._keys[key]
+            for length in range(MIN_FUZZY_LENGTH - 1, min(len(key), FUZZY_PREFIX) + 1):
+                prefix = key[:length]
+                for variant in _deletions(prefix) | {prefix}:
+                    self._fuzzy.setdefault(variant, set()).add(country)
+
+    @classmethod
+    def build(cls, store=None):
+        """Index every pycountry name, common and official name and alpha code, plus the store's altSpellings."""
+        import pycountry
+        names = []
+        by_alpha_2 = {}
+        for country in pycountry.countries:
+            by_alpha_2[country.alpha_2] = country.name
+            for key in (country.name, getattr(country, "common_name", None), getattr(country, "official_name", None),
+                        country.alpha_2, country.alpha_3):
+                if key:
+                    names.append((key, country.name))
+        from country_data import _NAME_ALIASES
+        for alias, code in _NAME_ALIASES.items():
+            if code.upper() in by_alpha_2:
+                names.append((alias, by_alpha_2[code.upper()]))
+        for record in store.records() if store is not None else ():
+            common = record.get("name", {}).get("common")
+            country = by_alpha_2.get(record.get("cca2"), common)
+            if not country:
+                continue
+            for key in [common, record.get("name", {}).get("official"), record.get("cca3")] + record.get("altSpellings", []):
+                if key:
+                    names.append((key, country))
+        return cls(names)
+
+    def resolve(self, text):
+        """The canonical country name text spells exactly (case-insensitive), or None."""
+        return self._keys.get(fold(text))
+
+    def lookup_name(self, text):
+        """The name to explore for text: the canonical name it spells exactly, else the text itself.
+
+        Names missing from the index (e.g. "Russia" or "Brunei" without a bulk snapshot) still go to REST
+        Countries; suggestions are only offered, never picked for the user.
+        """
+        return self.resolve(text) or text.strip()
+
+    def suggest(self, text, limit=MAX_SUGGESTIONS):
+        """Up to limit country names for what has been typed: exact match, then prefix matches, then one-typo matches."""
+        query = fold(text)
+        if not query:
+            return []
+        suggestions = []
+        exact = self._keys.get(query)
+        if exact:
+            suggestions.append(exact)
+        prefix_matches = []
+        for i in range(bisect_left(self._sorted, query), len(self._sorted)):
+            key = self._sorted[i]
+            if not key.startswith(query):
+                break
+            # Names that start with the query rank above names with a later word starting with it.
+            prefix_matches.append((key in self._word_keys, len(key), key))
+        for _, _, key in sorted(prefix_matches):
+            country = self._keys[key]
+            if country not in suggestions:
+                suggestions.append(country)
+                if len(suggestions) == limit:
+                    return suggestions
+        if len(query) >= MIN_FUZZY_LENGTH:
+            query = query[:FUZZY_PREFIX]
+            fuzzy = set()
+            for variant in _deletions(query) | {query}:
+                fuzzy |= self._fuzzy.get(variant, set())
+            suggestions.extend(sorted(fuzzy - set(suggestions))[:limit - len(suggestions)])
+        return suggestions
+
+
+_index = None
+
+
+def get_index():
+    """The shared CountryIndex, including altSpellings from the bulk snapshot when one has been saved."""
+    global _index
+    if _index is None:
+        import country_data
+        store = country_data._country_store
+        if store is None and os.path.exists(SNAPSHOT_PATH):
+            try:
+                store = CountryStore.load(SNAPSHOT_PATH)
+            except (OSError, ValueError, KeyError):
+                store = None
+        _index = CountryIndex.build(store)
+    return _index